@@ -7,13 +7,14 @@ License: MIT
 """
 
 from aqt import mw
-from aqt.qt import QAction, QShortcut, QKeySequence, Qt, QUrl
+from aqt.qt import QAction, QShortcut, QKeySequence, Qt, QUrl, QTimer
 from aqt import gui_hooks
 from aqt.utils import qconnect
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWebEngineCore import QWebEngineSettings
 
 from .taskui import Taskbar, find_web_file
+from .managers import SettingsManager
 from .__version__ import __version__, get_version_info
 
 # Global instance to manage state
@@ -48,6 +49,43 @@ def check_and_start_tour():
             return True
     return False
 
+def create_taskbar(preloaded: bool = False):
+    mw.taskbar_widget = Taskbar(preloaded=preloaded)
+
+    # Center on parent window
+    mw_geom = mw.geometry()
+    tb_geom = mw.taskbar_widget.frameGeometry()
+    center_point = mw_geom.center()
+    tb_geom.moveCenter(center_point)
+    mw.taskbar_widget.move(tb_geom.topLeft())
+
+def preload_taskbar():
+    """Build the taskbar hidden so the first toggle only has to show it."""
+    if mw.taskbar_widget is not None:
+        return
+    if mw.col is None:
+        # Profile not open yet; try again once it is
+        gui_hooks.profile_did_open.append(_preload_after_profile_open)
+        return
+    # Leave the first-run tour to the first explicit toggle
+    if not (Path(__file__).parent / ".anki_task_bar_initialized").exists():
+        return
+    print("Preloading Taskbar in the background...")
+    create_taskbar(preloaded=True)
+    # Built hidden, so no hideEvent will put it in low-power mode
+    mw.taskbar_widget.enter_hidden_mode()
+
+def _preload_after_profile_open():
+    # Removing ourselves while the hook list is being run would skip the next hook
+    QTimer.singleShot(0, lambda: gui_hooks.profile_did_open.remove(_preload_after_profile_open))
+    QTimer.singleShot(0, preload_taskbar)
+
+def schedule_preload():
+    settings = SettingsManager(Path(__file__).parent / "config.json").load()
+    if settings.get("preloadOnStartup", False):
+        # Zero-delay timers fire once the event loop has drained startup work
+        QTimer.singleShot(0, preload_taskbar)
+
 def toggle_taskbar():
     print(f"Toggle Taskbar Triggered! (v{__version__})")
     
@@ -55,14 +93,7 @@ def toggle_taskbar():
     is_first_run = (Path(__file__).parent / ".anki_task_bar_initialized").exists() == False
     
     if mw.taskbar_widget is None:
-        mw.taskbar_widget = Taskbar()
-
-        # Center on parent window
-        mw_geom = mw.geometry()
-        tb_geom = mw.taskbar_widget.frameGeometry()
-        center_point = mw_geom.center()
-        tb_geom.moveCenter(center_point)
-        mw.taskbar_widget.move(tb_geom.topLeft())
+        create_taskbar()
 
     if mw.taskbar_widget.isVisible():
         mw.taskbar_widget.hide()
@@ -70,14 +101,9 @@ def toggle_taskbar():
         mw.taskbar_widget.show()
         mw.taskbar_widget.activateWindow()
 
-        # Check if first run and start tour
+        # Check if first run and start tour; showEvent resumes the page and pushes state
         if is_first_run:
             check_and_start_tour()
-        else:
-            # Soft refresh via JS to preserve scroll position
-            mw.taskbar_widget.web_view.page().runJavaScript(
-                "if(window.refreshData) window.refreshData();"
-            )
 
 
 def open_taskbar_devtools():
@@ -123,5 +149,7 @@ def init_taskbar_menu():
     qconnect(inspect_shortcut.activated, open_taskbar_devtools)
     mw.taskbar_inspect_shortcut = inspect_shortcut
 
+    schedule_preload()
+
 
 gui_hooks.main_window_did_init.append(init_taskbar_menu)
@@ -0,0 +1,95 @@
+"""
+Benchmark: session stats for get_sessions, per-session rebuild vs. SessionStatsIndex
+
+Runs without Anki on the generated collection from fake_anki.py.
+
+    python bench/bench_session_stats.py [--decks 3000] [--sessions 10,50,150,500]
+"""
+
+import argparse
+import random
+import time
+import types
+
+from fake_anki import FakeCollection, install, import_addon
+
+
+def _per_session(decks, mw, sessions):
+    # Original get_sessions behaviour: one tree walk and snapshot read per session
+    out = {}
+    for s in sessions:
+        decks.cache.invalidate()
+        counts = decks.get_deck_counts_map()
+        snapshot = mw.col.get_config("anki_task_bar_snapshot", {})
+        total_start = total_done = 0
+        for did in s["deck_ids"]:
+            now = counts.get(did, 0)
+            start = max(int(snapshot.get(str(did), now)), now)
+            total_start += start
+            total_done += start - now
+        out[s["id"]] = (total_start, total_done)
+    return out
+
+
+def _rebuild(decks, SessionStatsIndex, mw, sessions):
+    # Cold: fresh counts map and an empty index
+    decks.cache.invalidate()
+    index = SessionStatsIndex()
+    index.sync(sessions, 1, decks.get_deck_counts_map(), mw.col.get_config("anki_task_bar_snapshot", {}), 1)
+    index.apply(sessions)
+    return index
+
+
+def _after_answer(decks, index, mw, sessions, card):
+    # Warm: one answered card, only the sessions holding its deck are touched
+    index.mark_decks(decks.cache.apply_answer(card))
+    index.sync(sessions, 1, decks.get_deck_counts_map(), mw.col.get_config("anki_task_bar_snapshot", {}), 1)
+    index.apply(sessions)
+
+
+def _timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--decks", type=int, default=3000)
+    ap.add_argument("--sessions", default="10,50,150,500")
+    ap.add_argument("--decks-per-session", type=int, default=12)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    random.seed(1)
+    col = FakeCollection(decks=args.decks, revlog=0)
+    dids = list(col.names)
+    col.config = {"anki_task_bar_day": col.sched.today,
+                  "anki_task_bar_snapshot": {str(d): random.randint(0, 80) for d in dids[::3]}}
+    install(col)
+    managers, _ = import_addon()
+    from aqt import mw
+    decks = managers.DeckManager()
+    Index = managers.SessionStatsIndex
+
+    print(f"decks={args.decks} decks/session={args.decks_per_session}")
+    print(f"{'sessions':>9} {'per-session ms':>15} {'rebuild ms':>11} {'answer ms':>10}")
+    for n in (int(x) for x in args.sessions.split(",")):
+        sessions = [{"id": str(i), "deck_ids": random.sample(dids, args.decks_per_session)} for i in range(n)]
+        old = _timeit(lambda: _per_session(decks, mw, sessions), args.repeat)
+        cold = _timeit(lambda: _rebuild(decks, Index, mw, sessions), args.repeat)
+        index = _rebuild(decks, Index, mw, sessions)
+        card = types.SimpleNamespace(did=sessions[0]["deck_ids"][0], queue=2, type=2, due=0)
+        warm = _timeit(lambda: _after_answer(decks, index, mw, sessions, card), args.repeat)
+        # The running sums must agree with a from-scratch pass over the current counts
+        fresh = Index()
+        fresh.sync(sessions, 1, decks.get_deck_counts_map(), mw.col.get_config("anki_task_bar_snapshot", {}), 1)
+        assert all(index.stats(s["id"]) == fresh.stats(s["id"]) for s in sessions)
+        print(f"{n:>9} {old:>15.2f} {cold:>11.2f} {warm:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Checks: deck picker reads (paths, search) against the generated collection
+
+Runs without Anki on the generated collection from fake_anki.py; exits
+non-zero on the first failed check.
+
+    python bench/check_decks.py [--decks 1000]
+"""
+
+import argparse
+
+from fake_anki import FakeCollection, install, import_addon
+
+
+def check_paths(decks, col):
+    top = next(did for did, name in col.names.items() if "::" not in name)
+    child = next(did for did, name in col.names.items() if name.count("::") == 1)
+    stale = 999999
+    found = decks.paths([top, child, stale])
+    assert found[str(top)] == [], "a top-level deck has an empty path"
+    parent = next(did for did, name in col.names.items() if name == col.names[child].rpartition("::")[0])
+    assert found[str(child)] == [parent], "a subdeck's path is its parent"
+    assert str(stale) not in found, "a deleted deck should be left out, not given a path"
+
+
+def check_short_search(decks, col):
+    # Two characters from the middle of "Kanji": no trigram, and not a word prefix
+    want = {did for did, name in col.names.items() if "ji" in name.rpartition("::")[2].lower()}
+    assert want, "the generated collection should have Kanji decks"
+    found = set(decks.search_index.search("ji", len(col.names)))
+    assert found == want, f"'ji' matched {len(found)} of {len(want)} decks"
+    assert set(decks.search_index.search("ji 1", len(col.names))) <= want
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--decks", type=int, default=1000)
+    args = ap.parse_args()
+
+    col = FakeCollection(decks=args.decks, revlog=0)
+    install(col)
+    managers, _ = import_addon()
+    decks = managers.DeckManager()
+    check_paths(decks, col)
+    check_short_search(decks, col)
+    print("decks: paths and short searches OK")
+
+
+if __name__ == "__main__":
+    main()
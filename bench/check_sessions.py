@@ -0,0 +1,89 @@
+"""
+Checks: SessionManager write coalescing and crash safety
+
+Runs without Anki on the generated collection from fake_anki.py; exits
+non-zero on the first failed check.
+
+    python bench/check_sessions.py [--mutations 50]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from fake_anki import FakeCollection, install, import_addon, write_sessions
+
+
+def _fresh(managers, col, tmp, name):
+    path = tmp / name
+    write_sessions(path, col, 20)
+    sm = managers.SessionManager(path)
+    sm.load()
+    return sm, path
+
+
+def check_coalesced(managers, col, tmp, mutations):
+    sm, path = _fresh(managers, col, tmp, "coalesced.json")
+    before = path.read_bytes()
+    for i in range(mutations):
+        sm.upsert(f"new-{i}", {"name": f"New {i}", "deck_ids": [], "folder": ""})
+    sm.create_folder("Extra")
+    sm.set_active("new-0")
+    assert sm._timer.isActive(), "changes should arm the flush timer"
+    assert sm.write_count == 0 and path.read_bytes() == before, "changes should wait for the flush window"
+    sm.flush()
+    sm.flush()
+    assert sm.write_count == 1, f"{mutations + 2} changes gave {sm.write_count} writes"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert len(data["sessions"]) == 20 + mutations and "Extra" in data["folders"]
+    assert data["active_session_id"] == "new-0"
+
+
+def check_failed_write(managers, col, tmp):
+    sm, path = _fresh(managers, col, tmp, "failed.json")
+    before = path.read_bytes()
+    sm.upsert("lost", {"name": "Lost", "deck_ids": [], "folder": ""})
+    # Interrupted after the temp file was written, and while writing it
+    for target, name in ((managers.os, "replace"), (managers.os, "fsync")):
+        with mock.patch.object(target, name, side_effect=OSError("interrupted")), \
+                contextlib.redirect_stderr(io.StringIO()):
+            sm.flush()
+        assert path.read_bytes() == before, f"a failed {name} changed sessions.json"
+        assert sm.write_count == 0 and sm._dirty, f"a failed {name} should keep the change pending"
+        assert managers.SessionManager(path).get("lost") is None
+    sm.flush()
+    assert sm.write_count == 1 and managers.SessionManager(path).get("lost") is not None
+
+
+def check_profile_close(managers, col, tmp):
+    from aqt import gui_hooks
+    sm, path = _fresh(managers, col, tmp, "close.json")
+    sm.install_hooks()
+    sm.delete_folder("Folder 0")
+    for hook in gui_hooks.profile_will_close: hook()
+    assert sm.write_count == 1, "profile_will_close should flush pending changes"
+    assert "Folder 0" not in json.loads(path.read_text(encoding="utf-8"))["folders"]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mutations", type=int, default=50)
+    args = ap.parse_args()
+
+    col = FakeCollection(decks=200, revlog=0)
+    install(col)
+    managers, _ = import_addon()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        check_coalesced(managers, col, tmp, args.mutations)
+        check_failed_write(managers, col, tmp)
+        check_profile_close(managers, col, tmp)
+    print("sessions: coalesced writes, failed writes and profile close OK")
+
+
+if __name__ == "__main__":
+    main()
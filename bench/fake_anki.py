@@ -0,0 +1,245 @@
+"""
+Stand-in for the parts of Anki (aqt / aqt.qt / mw.col) the add-on touches, so
+managers.py and bridge.py can be imported and timed outside Anki.
+
+    from fake_anki import FakeCollection, install, import_addon
+    col = FakeCollection(decks=2000, depth=4, revlog=50000)
+    install(col)
+    managers, bridge = import_addon()
+"""
+
+import importlib
+import json
+import random
+import sqlite3
+import sys
+import time
+import types
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+PACKAGE = "anki_task_bar"
+
+
+class _Node:
+    __slots__ = ("name", "deck_id", "review_count", "learn_count", "new_count", "children")
+
+    def __init__(self, name, deck_id, rng):
+        self.name, self.deck_id = name, deck_id
+        self.review_count = rng.randint(0, 40)
+        self.learn_count = rng.randint(0, 5)
+        self.new_count = rng.randint(0, 20)
+        self.children = []
+
+
+class _Sched:
+    def __init__(self, col):
+        self.col = col
+        self.today = 1000
+        self.day_cutoff = int(time.time()) // 86400 * 86400 + 86400
+
+    def deck_due_tree(self):
+        return self.col.tree
+
+
+class _Decks:
+    def __init__(self, col):
+        self.col = col
+
+    def all_names_and_ids(self):
+        return [types.SimpleNamespace(id=did, name=name) for did, name in self.col.names.items()]
+
+    def name(self, did):
+        return self.col.names[did]
+
+
+class _DB:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def first(self, sql, *args):
+        return self.conn.execute(sql, args).fetchone()
+
+    def all(self, sql, *args):
+        return self.conn.execute(sql, args).fetchall()
+
+    def scalar(self, sql, *args):
+        row = self.first(sql, *args)
+        return row[0] if row else None
+
+
+class FakeCollection:
+    """Generated deck tree of `decks` decks at most `depth` levels deep, with
+    `cards` cards spread over them and `revlog` review entries for today."""
+
+    def __init__(self, decks=1000, depth=4, cards=None, revlog=10000, seed=1):
+        rng = random.Random(seed)
+        self.tree = _Node("", 0, rng)
+        self.names = {}
+        words = ("Vocab", "Grammar", "Kanji", "Anatomy", "History", "Chemistry", "Verbs", "Listening")
+        parents, nodes = [(self.tree, 0)], []
+        for i in range(decks):
+            # A few top-level decks first, then anywhere above the depth limit
+            parent, level = parents[0] if i < 8 else rng.choice(parents)
+            did = 1500000000000 + i
+            leaf = f"{rng.choice(words)} {i}"
+            node = _Node(leaf, did, rng)
+            parent.children.append(node)
+            nodes.append(node)
+            self.names[did] = f"{self.names[parent.deck_id]}::{leaf}" if parent.deck_id else leaf
+            if level + 1 < depth: parents.append((node, level + 1))
+        for node in [self.tree] + nodes:
+            node.children.sort(key=lambda n: n.name.lower())
+
+        self.sched = _Sched(self)
+        self.decks = _Decks(self)
+        self.config = {}
+        self.mod_count = 0
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE cards (id INTEGER PRIMARY KEY, did INTEGER, queue INTEGER, type INTEGER, due INTEGER)")
+        conn.execute("CREATE TABLE revlog (id INTEGER PRIMARY KEY, cid INTEGER, time INTEGER)")
+        dids = list(self.names)
+        n_cards = cards if cards is not None else max(decks * 20, 1)
+        conn.executemany("INSERT INTO cards VALUES (?, ?, ?, ?, ?)",
+                         ((cid, rng.choice(dids), rng.choice((0, 1, 2, 3)), rng.choice((0, 1, 2)),
+                           self.sched.today + rng.randint(-5, 30)) for cid in range(1, n_cards + 1)))
+        start_ms = (self.sched.day_cutoff - 86400) * 1000
+        conn.executemany("INSERT INTO revlog VALUES (?, ?, ?)",
+                         ((start_ms + i * 97, rng.randint(1, n_cards), rng.randint(1000, 30000))
+                          for i in range(revlog)))
+        conn.execute("CREATE INDEX ix_revlog_cid ON revlog (cid)")
+        conn.commit()
+        self.db = _DB(conn)
+
+    def get_config(self, key, default=None):
+        return self.config.get(key, default)
+
+    def set_config(self, key, value):
+        self.config[key] = json.loads(json.dumps(value))
+
+    def setMod(self):
+        self.mod_count += 1
+
+    def random_card(self, rng=random):
+        cid, did, queue, ctype, due = self.db.first("SELECT * FROM cards WHERE id = ?", rng.randint(1, self.db.scalar("SELECT MAX(id) FROM cards")))
+        return types.SimpleNamespace(id=cid, did=did, queue=queue, type=ctype, due=due)
+
+
+def write_sessions(path: Path, col: FakeCollection, sessions: int, decks_per_session=12, folders=5, seed=1):
+    """Write a sessions.json with `sessions` sessions over random decks of `col`."""
+    rng = random.Random(seed)
+    dids = list(col.names)
+    data = {
+        "sessions": [{"id": str(1700000000000 + i), "name": f"Session {i}",
+                      "deck_ids": rng.sample(dids, min(decks_per_session, len(dids))),
+                      "folder": f"Folder {i % folders}" if folders else ""} for i in range(sessions)],
+        "active_session_id": None,
+        "folders": [f"Folder {i}" for i in range(folders)],
+    }
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class _Hooks:
+    """Every attribute is a hook list; nothing ever fires them."""
+    def __getattr__(self, name):
+        hook = []
+        setattr(self, name, hook)
+        return hook
+
+
+class _Signal:
+    def __init__(self, *types_): pass
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None: return self
+        bound = obj.__dict__.get(self.name)
+        if bound is None: bound = obj.__dict__[self.name] = _BoundSignal()
+        return bound
+
+
+class _BoundSignal:
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, fn): self.slots.append(fn)
+
+    def emit(self, *args):
+        for fn in self.slots: fn(*args)
+
+
+class _Timer:
+    def __init__(self, parent=None):
+        self.timeout = _BoundSignal()
+        self._active = False
+
+    def setSingleShot(self, single): pass
+
+    def setInterval(self, ms): pass
+
+    def start(self, ms=None): self._active = True
+
+    def stop(self): self._active = False
+
+    def isActive(self): return self._active
+
+    @staticmethod
+    def singleShot(ms, fn): pass
+
+
+class _QObject:
+    def __init__(self, parent=None):
+        self._parent = parent
+
+    def parent(self): return self._parent
+
+
+class _QueryOp:
+    """Runs the op inline, as if the background thread finished at once."""
+    def __init__(self, parent, op, success):
+        self.op, self.success, self._failure = op, success, None
+
+    def failure(self, fn):
+        self._failure = fn
+        return self
+
+    def run_in_background(self):
+        try: result = self.op(mw.col)
+        except Exception as e:
+            if self._failure: self._failure(e)
+            return
+        self.success(result)
+
+
+def _slot(*types_, **kwargs):
+    return lambda fn: fn
+
+
+mw = types.SimpleNamespace(col=None, pm=types.SimpleNamespace(name="User 1"))
+
+
+def install(col: FakeCollection):
+    """Register fake aqt modules backed by `col`; safe to call again with a new collection."""
+    mw.col = col
+    qt = types.SimpleNamespace(QObject=_QObject, pyqtSlot=_slot, pyqtSignal=_Signal, QTimer=_Timer,
+                               QFileDialog=None, QUrl=None, QApplication=None)
+    aqt = types.ModuleType("aqt")
+    aqt.mw, aqt.gui_hooks, aqt.qt = mw, _Hooks(), qt
+    sys.modules["aqt"] = aqt
+    sys.modules["aqt.qt"] = qt
+    sys.modules["aqt.operations"] = types.SimpleNamespace(QueryOp=_QueryOp)
+    sys.modules["aqt.utils"] = types.SimpleNamespace(tooltip=print, showWarning=print)
+    sys.modules["aqt.reviewer"] = types.SimpleNamespace(Reviewer=type("Reviewer", (), {}))
+
+
+def import_addon():
+    """Import managers and bridge as submodules of the add-on package, without running __init__.py."""
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(REPO)]
+        sys.modules[PACKAGE] = package
+    managers = importlib.import_module(f"{PACKAGE}.managers")
+    bridge = importlib.import_module(f"{PACKAGE}.bridge")
+    return managers, bridge
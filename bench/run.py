@@ -0,0 +1,170 @@
+"""
+Benchmark suite: times the managers and every read-path Bridge slot against a
+generated collection (see fake_anki.py) at several scales, without Anki.
+
+    python bench/run.py [--scales small,medium,large] [--repeat 7] [--out results.json]
+    python bench/run.py --compare baseline.json [--threshold 0.25]
+
+Results are written as JSON; --compare re-runs the suite and exits non-zero if
+any benchmark's median got slower than the baseline by more than --threshold.
+"""
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fake_anki import FakeCollection, install, import_addon, write_sessions, REPO
+
+SCALES = {
+    "small": dict(decks=200, depth=3, revlog=5000, sessions=20, selected=10),
+    "medium": dict(decks=2000, depth=4, revlog=50000, sessions=200, selected=50),
+    "large": dict(decks=10000, depth=5, revlog=300000, sessions=1000, selected=200),
+}
+
+
+def _time(fn, setup, repeat):
+    samples = []
+    for _ in range(repeat):
+        if setup: setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {"best_ms": round(min(samples), 4), "median_ms": round(statistics.median(samples), 4)}
+
+
+def _cases(managers, bridge, col, data_dir):
+    """(name, setup, fn) for everything timed; setup runs untimed before each sample."""
+    b = bridge
+    rng = random.Random(3)
+    sessions_path = data_dir / "sessions.json"
+
+    def cold_counts():
+        b.decks.cache.invalidate()
+
+    def cold_all():
+        b.decks.cache.invalidate()
+        b.decks.index.invalidate()
+        b.reviews.invalidate()
+        b._state_dirty = True
+
+    def dirty_state():
+        b._state_dirty = True
+
+    def upsert_flush():
+        b.sessions.upsert("bench", {"name": "Bench", "deck_ids": rng.sample(list(col.names), 5), "folder": ""})
+        b.sessions.flush()
+
+    batch = json.dumps([{"method": "get_state", "args": []}, {"method": "get_sessions", "args": []},
+                        {"method": "get_today_review_totals", "args": []}])
+    selected = json.dumps(b._load_selected_ids())
+    first_deck = str(next(iter(col.names)))
+    sessions_version = json.loads(b.get_sessions_delta(""))["version"]
+
+    return [
+        ("decks.counts[cold]", cold_counts, b.decks.get_deck_counts_map),
+        ("decks.index[cold]", b.decks.index.invalidate, b.decks.index.names),
+        ("decks.search_index[cold]", b.decks.index.invalidate, lambda: b.decks.search_index.search("kanji", 50)),
+        ("decks.children_page", None, lambda: b.decks.children_page(0, 0, 200)),
+        ("sessions.load[cold]", None, lambda: managers.SessionManager(sessions_path).load()),
+        ("sessions.upsert+flush", None, upsert_flush),
+        ("bridge.get_state[cold]", cold_all, b.get_state),
+        ("bridge.get_state[warm]", dirty_state, b.get_state),
+        ("bridge.get_taskbar_tasks", None, b.get_taskbar_tasks),
+        ("bridge.get_sessions[cold]", cold_counts, b.get_sessions),
+        ("bridge.get_sessions[warm]", None, b.get_sessions),
+        ("bridge.get_sessions_delta[unchanged]", None, lambda: b.get_sessions_delta(sessions_version)),
+        ("bridge.get_taskbar_tasks_delta[unchanged]", None, lambda: b.get_taskbar_tasks_delta(b._tasks.version)),
+        ("bridge.get_today_review_totals[cold]", b.reviews.invalidate, b.get_today_review_totals),
+        ("bridge.get_today_review_totals_by_deck[cold]", b.reviews.invalidate,
+         lambda: b.get_today_review_totals_by_deck(selected)),
+        ("bridge.get_deck_tree[cold]", cold_counts, b.get_deck_tree),
+        ("bridge.get_deck_children", None, lambda: b.get_deck_children("0", 0, 200)),
+        ("bridge.get_deck_descendants", None, lambda: b.get_deck_descendants(first_deck)),
+        ("bridge.search_decks", None, lambda: b.search_decks("kanji 1", 200)),
+        ("bridge.get_history", None, lambda: b.get_history(30)),
+        ("bridge.get_due_forecast[cold]", b.forecast.invalidate, lambda: b.get_due_forecast(selected, 7)),
+        ("bridge.get_due_forecast[warm]", None, lambda: b.get_due_forecast(selected, 7)),
+        ("bridge.batch", dirty_state, lambda: b.batch(batch)),
+        ("bridge.on_card_answered", None, lambda: b._on_card_answered(None, col.random_card(rng), 3)),
+    ]
+
+
+def run_scale(name, params, repeat):
+    col = FakeCollection(decks=params["decks"], depth=params["depth"], revlog=params["revlog"])
+    install(col)
+    managers, bridge_mod = import_addon()
+    data_dir = Path(tempfile.mkdtemp(prefix="anki_task_bar_bench_"))
+    try:
+        write_sessions(data_dir / "sessions.json", col, params["sessions"])
+        selected = random.Random(2).sample(list(col.names), params["selected"])
+        (data_dir / "selected_decks.json").write_text(json.dumps({"selected_decks": selected}), encoding="utf-8")
+        bridge = bridge_mod.Bridge(data_dir / "selected_decks.json")
+        today = col.sched.today
+        for day in range(today - 60, today):
+            bridge.history.append_day(day, {str(d): 20 for d in selected}, {str(d): 20 - day % 3 for d in selected})
+        results = {}
+        for case, setup, fn in _cases(managers, bridge, col, data_dir):
+            results[case] = _time(fn, setup, repeat)
+            print(f"  {case:<48} {results[case]['median_ms']:>10.3f} ms")
+        bridge.history.close()
+        return results
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def _meta():
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True).stdout.strip()
+    except Exception: commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "commit": commit,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(baseline, current, threshold):
+    """Print per-benchmark ratios; returns the regressed benchmark names."""
+    regressions = []
+    print(f"\n{'benchmark':<56} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+    for scale, cases in current["results"].items():
+        for case, now in cases.items():
+            base = baseline.get("results", {}).get(scale, {}).get(case)
+            if not base: continue
+            ratio = now["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+            # Ignore sub-millisecond noise
+            slower = ratio > 1 + threshold and now["median_ms"] - base["median_ms"] > 0.5
+            if slower: regressions.append(f"{scale}/{case}")
+            print(f"{scale + '/' + case:<56} {base['median_ms']:>10.3f} {now['median_ms']:>10.3f} {ratio:>6.2f}x"
+                  + ("  SLOWER" if slower else ""))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", default="small,medium")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", help="baseline results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.25)
+    args = ap.parse_args()
+
+    report = {"meta": _meta(), "repeat": args.repeat, "results": {}}
+    for scale in args.scales.split(","):
+        print(f"{scale}: {SCALES[scale]}")
+        report["results"][scale] = run_scale(scale, SCALES[scale], args.repeat)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
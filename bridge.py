@@ -1,12 +1,15 @@
-from aqt.qt import QObject, pyqtSlot, QFileDialog, QUrl, QApplication
-from aqt import mw
+from aqt.qt import QObject, pyqtSlot, pyqtSignal, QFileDialog, QUrl, QApplication, QTimer
+from aqt import mw, gui_hooks
+import functools
 import json
+import sys
 import traceback
 from pathlib import Path
 from typing import Dict, Any, List
-from datetime import date
-from .managers import SettingsManager, SessionManager, DeckManager
+from datetime import date, timedelta
+from .managers import SettingsManager, SessionManager, DeckManager, DeckMetadataStore, SessionStatsIndex, VersionedCollection, ReviewStatsManager, DueForecast, SnapshotStore, HistoryArchive, SlotProfiler
 
+from aqt.operations import QueryOp
 from aqt.utils import tooltip, showWarning
 import time
 
@@ -27,272 +30,623 @@ def _anki_day_start_end_ms() -> tuple[int, int]:
     end_ms = int(cutoff) * 1000
     return end_ms - (86400 * 1000), end_ms
 
+def _profiled(fn):
+    """Time a Bridge slot into self.profiler while profiling is enabled."""
+    @functools.wraps(fn)
+    def wrapper(self, *args):
+        if not self.profiler.enabled: return fn(self, *args)
+        start = time.perf_counter()
+        try: result = fn(self, *args)
+        except Exception:
+            self.profiler.record_error(fn.__name__)
+            raise
+        self.profiler.record(fn.__name__, (time.perf_counter() - start) * 1000, result)
+        return result
+    return wrapper
+
 class Bridge(QObject):
+    # JSON list of {deckId, dueNow, done, progress, completed} for decks touched by an answer
+    taskUpdated = pyqtSignal(str)
+    # Versioned {version, totals, deck_totals, tasks_from, tasks_delta} payload, emitted only when it
+    # changes; tasks_delta holds the tasks changed since version tasks_from (see VersionedCollection)
+    stateChanged = pyqtSignal(str)
+    # (request id, JSON result) for calls made through request_async
+    resultReady = pyqtSignal(str, str)
+
+    # Slots whose cold caches request_async fills from a QueryOp worker (see _async_readers)
+    ASYNC_SLOTS = frozenset({
+        "get_today_review_totals", "get_today_review_totals_by_deck", "get_due_forecast",
+        "get_deck_tree", "get_deck_children", "get_deck_descendants", "get_deck_paths", "search_decks",
+    })
+    # Slots batch() and request_async may call; the ones outside ASYNC_SLOTS touch sessions,
+    # snapshots or the history archive and always run on the GUI thread
+    BATCH_SLOTS = ASYNC_SLOTS | frozenset({
+        "get_sessions", "get_sessions_delta", "get_history",
+        "get_state", "get_taskbar_tasks", "get_taskbar_tasks_delta", "get_selected_decks", "load_settings_from_file",
+    })
+
     def __init__(self, data_file: Path, parent=None):
         super().__init__(parent)
         self.data_file = data_file
         self.settings = SettingsManager(data_file.parent / "config.json")
+        self.profiler = SlotProfiler()
+        self.profiler.enabled = bool(self.settings.get("perfStats", False))
+        self.settings.subscribe(self._on_settings_changed)
         self.sessions = SessionManager(data_file.parent / "sessions.json")
+        self.sessions.install_hooks()
+        self.session_stats = SessionStatsIndex()
+        self.session_versions = VersionedCollection("id")
         self.decks = DeckManager()
-        self._deck_tree_cache = None
-        self._deck_tree_time = 0
+        self.decks.cache.install_hooks()
+        self.decks.index.install_hooks()
+        self.deck_meta = DeckMetadataStore(data_file.parent / "deck_metadata.json")
+        self.reviews = ReviewStatsManager()
+        self.reviews.install_hooks()
+        self.forecast = DueForecast()
+        self.forecast.install_hooks()
+        self.history = HistoryArchive(data_file.parent / "history")
+        self.snapshots = SnapshotStore(self.history)
+        self.snapshots.install_hooks()
+        gui_hooks.reviewer_did_answer_card.append(self._on_card_answered)
+
+        self._request_seq = 0
+        self._batch = None
+        # Set while the taskbar is hidden; pushes wait for resume()
+        self.suspended = False
+        self._state_version = 0
+        self._state_body = None
+        self._state_payload = None
+        self._state_push = None
+        self._tasks = VersionedCollection("deckId")
+        self._state_day = None
+        self._state_dirty = True
+        self._publish_timer = QTimer(self)
+        self._publish_timer.setSingleShot(True)
+        self._publish_timer.setInterval(500)
+        self._publish_timer.timeout.connect(self.publish_state)
+        gui_hooks.state_did_undo.append(self._schedule_publish)
+        gui_hooks.sync_did_finish.append(self._schedule_publish)
+        gui_hooks.profile_did_open.append(self._schedule_publish)
+        gui_hooks.operation_did_execute.append(self._on_operation)
+
+    def _on_operation(self, changes, handler):
+        if changes.study_queues or changes.deck or changes.deck_config: self._schedule_publish()
+
+    def _schedule_publish(self, *_):
+        # Coalesce bursts (several answers, sync + undo) into one push
+        self._state_dirty = True
+        if not self.suspended: self._publish_timer.start()
+
+    def _current_state(self) -> str:
+        if self._state_dirty or self._state_payload is None or self._state_day != mw.col.sched.today:
+            tasks = self._get_expanded_tasks()
+            start, end = _anki_day_start_end_ms()
+            by_deck = self.reviews.by_deck(start, end, self.decks.cache.ancestors)
+            empty = {"total_cards": 0, "total_reviews": 0, "total_time_ms": 0}
+            body = {
+                "tasks": tasks, "totals": self.reviews.totals(start, end),
+                "deck_totals": {str(t["deckId"]): by_deck.get(t["deckId"], empty) for t in tasks}
+            }
+            encoded = json.dumps(body)
+            if encoded != self._state_body:
+                self._state_version += 1
+                self._state_body = encoded
+                tasks_from = self._tasks.version
+                tasks_version = self._tasks.update(tasks)
+                self._state_payload = json.dumps(dict(body, version=self._state_version, tasks_version=tasks_version))
+                # Pushes leave the task list out and carry only what changed since the last one
+                push = {k: v for k, v in body.items() if k != "tasks"}
+                self._state_push = (json.dumps(dict(push, version=self._state_version, tasks_from=tasks_from))[:-1]
+                                    + ', "tasks_delta": ' + self._tasks.delta(tasks_from) + "}")
+            self._state_day = mw.col.sched.today
+            self._state_dirty = False
+        return self._state_payload
+
+    def publish_state(self):
+        """Emit stateChanged if the combined state changed since the last publish."""
+        if self.suspended: return
+        if not self._state_dirty and self._state_day == mw.col.sched.today: return
+        version = self._state_version
+        try: self._current_state()
+        except: return self._failed(None)
+        if self._state_version != version: self.stateChanged.emit(self._state_push)
+
+    def _on_card_answered(self, reviewer, card, ease):
+        self._schedule_publish()
+        touched = self.decks.cache.apply_answer(card)
+        self.session_stats.mark_decks(touched)
+        selected = set(self._load_selected_ids()).intersection(touched)
+        if not selected: return
+        counts = self.decks.get_deck_counts_map()
+        snapshot = self.snapshots.get()
+        deltas = []
+        for did in selected:
+            now = counts.get(did, 0)
+            start = max(int(snapshot.get(str(did), 0)), now)
+            done = max(start - now, 0)
+            self.snapshots.record_done(did, done)
+            deltas.append({
+                "deckId": did, "dueNow": now, "done": done,
+                "progress": 1.0 if start == 0 else min(1.0, round(done / start, 3)),
+                "completed": now == 0
+            })
+        if not self.suspended: self.taskUpdated.emit(json.dumps(deltas))
+
+    def suspend(self):
+        """Stop pushing to the page; state keeps being tracked and is sent once on resume."""
+        self.suspended = True
+        self._publish_timer.stop()
+
+    def resume(self):
+        self.suspended = False
+        self.publish_state()
 
     def _get_expanded_tasks(self) -> List[dict]:
         selected = self._load_selected_ids()
-        counts = self.decks.get_deck_counts_map()
-        snapshot = self.decks.ensure_snapshot(selected, counts)
-        tasks, updated = [], False
+        counts = self._scoped("counts", self.decks.get_deck_counts_map)
+        snapshot = self.snapshots.ensure_day(selected, counts)
+        # One mtime check per refresh; priority() and rank() below are plain lookups
+        meta = self.deck_meta
+        meta.refresh()
+        tasks = []
         for did in selected:
-            try: name = mw.col.decks.name(did)
-            except: continue
+            name = self.decks.index.name(did)
+            if name is None: continue
             now = counts.get(did, 0)
             start = max(snapshot.get(str(did), 0), now)
-            if start > snapshot.get(str(did), 0):
-                snapshot[str(did)] = start
-                updated = True
+            self.snapshots.raise_start(did, start)
             done = max(start - now, 0)
+            self.snapshots.record_done(did, done)
             tasks.append({
                 "deckId": did, "name": name, "dueStart": start, "dueNow": now, "done": done,
                 "progress": 1.0 if start == 0 else min(1.0, round(done / start, 3)),
-                "completed": now == 0
+                "completed": now == 0, "priority": meta.priority(did)
             })
-        if updated:
-            mw.col.set_config("anki_task_bar_snapshot", snapshot)
-            mw.col.setMod()
+        # Unfinished decks first, then by priority; the page renders in this order
+        tasks.sort(key=lambda t: (t["completed"], meta.rank(t["deckId"])))
         return tasks
 
+    def _failed(self, default):
+        """Return `default` from an except block, recording the exception while profiling."""
+        if self.profiler.enabled: self.profiler.record_error(sys._getframe(1).f_code.co_name)
+        return default
+
+    def _on_settings_changed(self, changed):
+        if "perfStats" in changed: self.profiler.enabled = bool(changed["perfStats"])
+
+    def _scoped(self, key, build):
+        """Memoize `build()` for the rest of the current batch() call."""
+        scope = self._batch
+        if scope is None: return build()
+        if key not in scope: scope[key] = build()
+        return scope[key]
+
     def _load_selected_ids(self) -> List[int]:
+        return self._scoped("selected", self._read_selected_ids)
+
+    def _read_selected_ids(self) -> List[int]:
         if not self.data_file.exists(): return []
         try:
             data = json.loads(self.data_file.read_text(encoding="utf-8"))
             return [int(d) for d in data.get("selected_decks", [])]
-        except: return []
+        except: return self._failed([])
 
     def _save_selected_ids(self, ids: List[int]):
         ids = list(dict.fromkeys([int(i) for i in ids]))
         counts = self.decks.get_deck_counts_map()
-        snapshot = mw.col.get_config("anki_task_bar_snapshot", {})
-        for did in ids: snapshot.setdefault(str(did), counts.get(did, 0))
-        mw.col.set_config("anki_task_bar_snapshot", snapshot)
-        mw.col.setMod()
+        for did in ids: self.snapshots.setdefault(did, counts.get(did, 0))
         self.data_file.write_text(json.dumps({"selected_decks": ids}, indent=2), encoding="utf-8")
+        if self._batch is not None: self._batch.pop("selected", None)
+        self._state_dirty = True
 
     @pyqtSlot(result=str)
+    @_profiled
     def get_taskbar_tasks(self):
         try: return json.dumps(self._get_expanded_tasks())
-        except: return "[]"
+        except: return self._failed("[]")
+
+    @pyqtSlot(str, result=str)
+    @_profiled
+    def get_taskbar_tasks_delta(self, since):
+        """Tasks added, changed or removed since version `since`; see VersionedCollection.delta."""
+        try:
+            self._current_state()
+            return self._tasks.delta(since)
+        except: return self._failed(json.dumps({"version": "", "full": True, "items": []}))
+
+    @pyqtSlot(result=str)
+    @_profiled
+    def get_state(self):
+        try: return self._current_state()
+        except: return self._failed(json.dumps({"version": 0, "tasks": [], "totals": {}, "deck_totals": {}}))
+
+    @pyqtSlot(result=str)
+    def get_perf_stats(self):
+        return json.dumps(self._perf_stats())
+
+    def _perf_stats(self) -> Dict[str, Any]:
+        # Renderer memory and lifecycle state are tracked by the Taskbar window
+        power_report = getattr(self.parent(), "power_report", None)
+        return dict(self.profiler.stats(), renderer=power_report() if power_report else None)
+
+    @pyqtSlot()
+    def reset_perf_stats(self):
+        self.profiler.reset()
+
+    @pyqtSlot(result=str)
+    def export_perf_stats(self):
+        try:
+            path, _ = QFileDialog.getSaveFileName(mw, "Export Performance Stats", "anki_task_bar_perf.json", "JSON (*.json)")
+            if not path: return json.dumps({"ok": False})
+            Path(path).write_text(json.dumps(self._perf_stats(), indent=2), encoding="utf-8")
+            return json.dumps({"ok": True, "path": path})
+        except Exception as e: return json.dumps({"ok": False, "error": str(e)})
+
+    @pyqtSlot(str, result=str)
+    @_profiled
+    def batch(self, json_calls):
+        """Run [{method, args}, ...] in one round trip; returns the results as one JSON list."""
+        try:
+            calls = json.loads(json_calls)
+            if not isinstance(calls, list): raise ValueError("batch expects a list of calls")
+        except: return self._failed("[]")
+        self._batch = {}
+        results = []
+        try:
+            for call in calls:
+                try:
+                    method = call.get("method")
+                    if method not in self.BATCH_SLOTS: raise ValueError(f"{method} cannot be batched")
+                    results.append(getattr(self, method)(*call.get("args", [])))
+                except Exception as e:
+                    results.append(self._failed(json.dumps({"ok": False, "error": str(e)})))
+        finally:
+            self._batch = None
+        # Each slot already returns JSON text, so join rather than re-encode
+        return "[" + ",".join(results) + "]"
+
+    @pyqtSlot(str, str, result=str)
+    @_profiled
+    def request_async(self, method, json_args):
+        """Answer a read slot without blocking the page; returns a request id, the result follows via resultReady.
+
+        Only collection queries run on the worker. Caches are filled and the slot
+        itself runs back on the GUI thread, so no manager state is touched off-thread.
+        """
+        self._request_seq += 1
+        rid = str(self._request_seq)
+        try:
+            if method not in self.BATCH_SLOTS: raise ValueError(f"{method} cannot be requested")
+            fn, args = getattr(self, method), json.loads(json_args or "[]")
+            readers = self._async_readers(method, args) if method in self.ASYNC_SLOTS else []
+        except Exception as e:
+            error = json.dumps({"ok": False, "error": str(e)})
+            # Deferred so the id reaches the page before its result does
+            QTimer.singleShot(0, lambda: self.resultReady.emit(rid, error))
+            return rid
+        def answer():
+            try: return fn(*args)
+            except Exception as e: return json.dumps({"ok": False, "error": str(e)})
+        if not readers:
+            QTimer.singleShot(0, lambda: self.resultReady.emit(rid, answer()))
+            return rid
+        def finish(results):
+            for (_, install), result in zip(readers, results): install(result)
+            self.resultReady.emit(rid, answer())
+        op = QueryOp(parent=mw, op=lambda col: [read(col) for read, _ in readers], success=finish)
+        op.failure(lambda e: self.resultReady.emit(rid, json.dumps({"ok": False, "error": str(e)})))
+        op.run_in_background()
+        return rid
+
+    def _async_readers(self, method, args):
+        """(read, install) pairs for the cold caches `method` needs, in install order."""
+        cache = self.decks.cache
+        if method == "get_today_review_totals":
+            readers = [self.reviews.totals_reader(*_anki_day_start_end_ms())]
+        elif method == "get_today_review_totals_by_deck":
+            readers = [cache.reader(), self.reviews.by_deck_reader(*_anki_day_start_end_ms(), cache.ancestors)]
+        elif method == "get_due_forecast":
+            readers = [cache.reader(), self.forecast.reader(min(max(int(args[1]), 1), 365), cache.ancestors)]
+        elif method == "get_deck_descendants":
+            readers = [self.decks.index.reader()]
+        elif method == "get_deck_tree":
+            readers = [cache.reader()]
+        else:
+            # get_deck_children, get_deck_paths and search_decks read both
+            readers = [self.decks.index.reader(), cache.reader()]
+        return [r for r in readers if r is not None]
 
     @pyqtSlot(result=str)
+    @_profiled
     def get_today_review_totals(self):
+        try: return json.dumps(self.reviews.totals(*_anki_day_start_end_ms()))
+        except: return self._failed(json.dumps({"total_cards": 0, "total_reviews": 0, "total_time_ms": 0}))
+
+    @pyqtSlot(str, result=str)
+    @_profiled
+    def get_today_review_totals_by_deck(self, json_dids):
         try:
-            start, end = _anki_day_start_end_ms()
-            reviews = mw.col.db.scalar("SELECT COUNT(*) FROM revlog WHERE id >= ? AND id < ?", start, end)
-            cards = mw.col.db.scalar("SELECT COUNT(DISTINCT cid) FROM revlog WHERE id >= ? AND id < ?", start, end)
-            time_ms = mw.col.db.scalar("SELECT SUM(time) FROM revlog WHERE id >= ? AND id < ?", start, end) or 0
-            return json.dumps({"total_cards": int(cards), "total_reviews": int(reviews), "total_time_ms": int(time_ms)})
-        except: return json.dumps({"total_cards": 0, "total_reviews": 0, "total_time_ms": 0})
+            by_deck = self.reviews.by_deck(*_anki_day_start_end_ms(), self.decks.cache.ancestors)
+            empty = {"total_cards": 0, "total_reviews": 0, "total_time_ms": 0}
+            return json.dumps({str(did): by_deck.get(int(did), empty) for did in json.loads(json_dids)})
+        except: return self._failed("{}")
+
+    @pyqtSlot(str, int, result=str)
+    @_profiled
+    def get_due_forecast(self, json_dids, days):
+        """Cards due today and on each of the next `days` - 1 days, per deck and summed."""
+        try:
+            days = min(max(days, 1), 365)
+            dids = [int(d) for d in json.loads(json_dids)]
+            ancestors = self.decks.cache.ancestors
+            decks = self.forecast.forecast(dids, days, ancestors)
+            return json.dumps({"days": days, "decks": {str(did): bins for did, bins in decks.items()},
+                               "total": self.forecast.total(dids, days, ancestors)})
+        except: return self._failed(json.dumps({"days": 0, "decks": {}, "total": []}))
+
+    @pyqtSlot(int, result=str)
+    @_profiled
+    def get_history(self, days):
+        """Daily start/done totals of the selected decks over the last `days` archived days, plus the streak."""
+        try:
+            today = mw.col.sched.today
+            dids = self._load_selected_ids()
+            rows = self.history.totals(today - max(days, 1), today - 1, dids)
+            for row in rows:
+                row["date"] = (date.today() - timedelta(days=today - row["day"])).isoformat()
+            return json.dumps({"days": rows, "streak": self.history.streak(today - 1, dids)})
+        except: return self._failed(json.dumps({"days": [], "streak": 0}))
 
     @pyqtSlot(result=str)
+    @_profiled
     def get_deck_tree(self):
-        now = time.time()
-        if self._deck_tree_cache and (now - self._deck_tree_time < 300): return self._deck_tree_cache
-        try:
-            self._deck_tree_cache = json.dumps(self.decks.get_deck_tree())
-            self._deck_tree_time = now
-            return self._deck_tree_cache
-        except: return "{}"
+        try: return self.decks.cache.tree_json()
+        except: return self._failed("{}")
+
+    @pyqtSlot(str, int, int, result=str)
+    @_profiled
+    def get_deck_children(self, parent_id, offset, limit):
+        try: return json.dumps(self.decks.children_page(int(parent_id or 0), offset, limit))
+        except: return self._failed(json.dumps({"parent": parent_id, "offset": offset, "total": 0, "items": []}))
+
+    @pyqtSlot(str, result=str)
+    @_profiled
+    def get_deck_descendants(self, did):
+        try: return json.dumps(self.decks.index.subtree(int(did or 0)))
+        except: return self._failed("[]")
+
+    @pyqtSlot(str, result=str)
+    @_profiled
+    def get_deck_paths(self, json_dids):
+        try: return json.dumps(self.decks.paths(json.loads(json_dids)))
+        except: return self._failed("{}")
+
+    @pyqtSlot(str, int, result=str)
+    @_profiled
+    def search_decks(self, query, limit):
+        try: return json.dumps(self.decks.search(query, limit))
+        except: return self._failed("[]")
 
     @pyqtSlot(result=str)
+    @_profiled
     def get_selected_decks(self):
         return json.dumps({"selected_decks": self._load_selected_ids()})
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def save_selected_decks(self, json_dids):
         try:
             self._save_selected_ids(json.loads(json_dids))
             return json.dumps({"ok": True})
-        except Exception as e: return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e: return self._failed(json.dumps({"ok": False, "error": str(e)}))
+
+    @pyqtSlot(result=str)
+    @_profiled
+    def get_deck_metadata(self):
+        try: return json.dumps(self.deck_meta.all())
+        except: return self._failed("{}")
+
+    @pyqtSlot(str, str, result=str)
+    @_profiled
+    def set_deck_priority(self, did_str, priority):
+        try:
+            self.deck_meta.update(int(did_str), {"priority": priority})
+            # Tasks come back re-sorted with the next push
+            self._schedule_publish()
+            return json.dumps({"ok": True})
+        except Exception as e: return self._failed(json.dumps({"ok": False, "error": str(e)}))
+
+    @pyqtSlot(str, result=str)
+    @_profiled
+    def import_deck_metadata(self, json_metadata):
+        """Take over the deck_metadata object older versions kept in localStorage."""
+        try:
+            added = self.deck_meta.merge(json.loads(json_metadata))
+            if added: self._schedule_publish()
+            return json.dumps({"ok": True, "imported": added})
+        except Exception as e: return self._failed(json.dumps({"ok": False, "error": str(e)}))
 
     @pyqtSlot(result=str)
+    @_profiled
     def get_sessions(self):
+        try: return json.dumps(self._sessions_with_stats())
+        except: return self._failed(json.dumps({"sessions": [], "active_session_id": None, "folders": []}))
+
+    @pyqtSlot(str, result=str)
+    @_profiled
+    def get_sessions_delta(self, since):
+        """Folders and active session, plus the sessions changed since version `since`."""
         try:
-            data = self.sessions.load()
-            for s in data.get("sessions", []):
-                s.update(self._calc_session_stats(s.get("deck_ids", [])))
-            return json.dumps(data)
-        except: return json.dumps({"sessions": [], "active_session_id": None, "folders": []})
-
-    def _calc_session_stats(self, dids: List[int]) -> Dict[str, Any]:
-        if not dids: return {"progress": 1.0, "total_cards": 0, "done_cards": 0}
-        counts = self.decks.get_deck_counts_map()
-        snapshot = mw.col.get_config("anki_task_bar_snapshot", {})
-        total_start, total_done = 0, 0
-        for did in dids:
-            now = counts.get(did, 0)
-            start = max(int(snapshot.get(str(did), now)), now)
-            total_start += start
-            total_done += (start - now)
-        return {
-            "progress": 1.0 if total_start == 0 else min(1.0, round(total_done / total_start, 3)),
-            "total_cards": total_start, "done_cards": total_done
-        }
+            data = self._sessions_with_stats()
+            ancestors = self.decks.cache.ancestors
+            self.session_versions.update([
+                dict(s, due_tomorrow=self.forecast.total(s.get("deck_ids", []), 2, ancestors)[1])
+                for s in data.get("sessions", [])])
+            head = json.dumps({"active_session_id": data.get("active_session_id"), "folders": data.get("folders", [])})
+            return head[:-1] + ", " + self.session_versions.delta(since)[1:]
+        except: return self._failed(json.dumps({"version": "", "full": True, "items": [], "active_session_id": None, "folders": []}))
+
+    def _sessions_with_stats(self) -> Dict[str, Any]:
+        data = self.sessions.load()
+        sessions = data.get("sessions", [])
+        self.session_stats.sync(sessions, self.sessions.revision,
+                                self._scoped("counts", self.decks.get_deck_counts_map),
+                                self._scoped("snapshot", self.snapshots.get), self.snapshots.revision)
+        self.session_stats.apply(sessions)
+        return data
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def upsert_session(self, json_session):
         try:
             s = json.loads(json_session)
-            data = self.sessions.load()
             sid = str(s.get("id") or int(time.time() * 1000))
-            found = False
-            for existing in data["sessions"]:
-                if str(existing.get("id")) == sid:
-                    existing.update({
-                        "name": s.get("name"), "deck_ids": s.get("deck_ids", []),
-                        "folder": s.get("folder", ""), "updated_at_ms": int(time.time() * 1000)
-                    })
-                    found = True; break
-            if not found:
-                data["sessions"].append({
-                    "id": sid, "name": s.get("name"), "deck_ids": s.get("deck_ids", []),
-                    "folder": s.get("folder", ""), "created_at_ms": int(time.time() * 1000)
-                })
-            self.sessions.save(data)
+            fields = {"name": s.get("name"), "deck_ids": s.get("deck_ids", []), "folder": s.get("folder", "")}
+            stamp = "updated_at_ms" if self.sessions.get(sid) else "created_at_ms"
+            fields[stamp] = int(time.time() * 1000)
+            self.sessions.upsert(sid, fields)
             return json.dumps({"ok": True, "id": sid})
-        except Exception as e: return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e: return self._failed(json.dumps({"ok": False, "error": str(e)}))
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def delete_session(self, sid):
-        data = self.sessions.load()
-        data["sessions"] = [s for s in data["sessions"] if str(s.get("id")) != str(sid)]
-        if str(data.get("active_session_id")) == str(sid): data["active_session_id"] = None
-        self.sessions.save(data)
+        self.sessions.delete(sid)
         return json.dumps({"ok": True})
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def activate_session(self, sid):
-        data = self.sessions.load()
-        session = next((s for s in data["sessions"] if str(s.get("id")) == str(sid)), None)
+        session = self.sessions.get(sid)
         if not session: return json.dumps({"ok": False, "error": "not found"})
         self._save_selected_ids(session.get("deck_ids", []))
-        data["active_session_id"] = sid
-        self.sessions.save(data)
+        self.sessions.set_active(sid)
         return json.dumps({"ok": True})
 
     @pyqtSlot(str)
+    @_profiled
     def start_review(self, did_str):
         did = int(did_str)
         if mw.col.decks.get(did):
             mw.col.decks.select(did)
             mw.moveToState("overview")
             mw.activateWindow()
-            if self.settings.load().get("autoHide", True) and self.parent():
+            if self.settings.get("autoHide", True) and self.parent():
                 self.parent().hide()
 
     @pyqtSlot()
+    @_profiled
+    def report_first_render(self):
+        parent = self.parent()
+        if parent is None or getattr(parent, "first_render_ms", 0) is not None: return
+        parent.first_render_ms = (time.perf_counter() - parent.created_at) * 1000
+        mode = "preloaded" if parent.preloaded else "on demand"
+        print(f"[Taskbar] First render {parent.first_render_ms:.0f} ms after construction ({mode})")
+        parent.on_first_render()
+
+    @pyqtSlot()
+    @_profiled
     def drag_window(self):
         if self.parent() and self.parent().windowHandle():
             self.parent().windowHandle().startSystemMove()
 
     @pyqtSlot()
+    @_profiled
     def close_window(self):
         if self.parent(): self.parent().hide()
 
     @pyqtSlot()
+    @_profiled
     def minimize_window(self):
         if self.parent(): self.parent().showMinimized()
 
     @pyqtSlot()
+    @_profiled
     def toggle_expand(self):
         if hasattr(self.parent(), 'toggle_expand'): self.parent().toggle_expand()
 
     @pyqtSlot(bool)
+    @_profiled
     def set_always_on_top(self, enabled):
         if hasattr(self.parent(), 'set_always_on_top'): self.parent().set_always_on_top(enabled)
 
     @pyqtSlot(str)
+    @_profiled
     def set_clipboard(self, text):
         QApplication.clipboard().setText(text)
 
     @pyqtSlot(str)
+    @_profiled
     def save_settings_to_file(self, json_data):
         self.settings.save(json.loads(json_data))
 
     @pyqtSlot(result=str)
+    @_profiled
     def load_settings_from_file(self):
         return json.dumps(self.settings.load())
 
     @pyqtSlot()
+    @_profiled
     def open_addon_folder(self):
         from aqt.utils import openFolder
         openFolder(str(self.data_file.parent))
 
     @pyqtSlot(str)
+    @_profiled
     def open_link(self, url):
         from aqt.qt import QDesktopServices, QUrl
         QDesktopServices.openUrl(QUrl(url))
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def create_folder(self, name):
-        data = self.sessions.load()
-        if name not in data["folders"]:
-            data["folders"].append(name)
-            self.sessions.save(data)
+        self.sessions.create_folder(name)
         return json.dumps({"ok": True})
 
     @pyqtSlot(str, str, result=str)
+    @_profiled
     def rename_folder(self, old, new):
-        data = self.sessions.load()
-        if old in data["folders"]:
-            data["folders"][data["folders"].index(old)] = new
-            for s in data["sessions"]:
-                if s.get("folder") == old: s["folder"] = new
-            self.sessions.save(data)
+        self.sessions.rename_folder(old, new)
         return json.dumps({"ok": True})
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def delete_folder(self, name):
-        data = self.sessions.load()
-        if name in data["folders"]:
-            data["folders"].remove(name)
-            for s in data["sessions"]:
-                if s.get("folder") == name: s["folder"] = ""
-            self.sessions.save(data)
+        self.sessions.delete_folder(name)
         return json.dumps({"ok": True})
 
     @pyqtSlot(int, int)
+    @_profiled
     def apply_window_size_preset(self, w, h):
         if self.parent(): self.parent().resize(max(w, 300), max(h, 200))
 
     @pyqtSlot(result=str)
+    @_profiled
     def export_sessions(self):
         try:
             path, _ = QFileDialog.getSaveFileName(mw, "Export Sessions", "sessions.json", "JSON (*.json)")
             if not path: return json.dumps({"ok": False})
             Path(path).write_text(json.dumps(self.sessions.load(), indent=2), encoding="utf-8")
             return json.dumps({"ok": True, "path": path})
-        except Exception as e: return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e: return self._failed(json.dumps({"ok": False, "error": str(e)}))
 
     @pyqtSlot(result=str)
+    @_profiled
     def import_sessions(self):
         try:
             path, _ = QFileDialog.getOpenFileName(mw, "Import Sessions", "", "JSON (*.json)")
             if not path: return json.dumps({"ok": False})
             self.sessions.save(json.loads(Path(path).read_text(encoding="utf-8")))
             return json.dumps({"ok": True})
-        except Exception as e: return json.dumps({"ok": False, "error": str(e)})
+        except Exception as e: return self._failed(json.dumps({"ok": False, "error": str(e)}))
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def move_session_to_folder(self, sid, folder):
-        data = self.sessions.load()
-        for s in data["sessions"]:
-            if str(s.get("id")) == str(sid):
-                s["folder"] = folder
-                if folder and folder not in data["folders"]: data["folders"].append(folder)
-                self.sessions.save(data)
-                return json.dumps({"ok": True})
-        return json.dumps({"ok": False})
+        return json.dumps({"ok": self.sessions.move_to_folder(sid, folder)})
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def shuffle_sessions(self, ids_json):
         import random
         ids = json.loads(ids_json)
@@ -300,16 +654,14 @@ class Bridge(QObject):
         return json.dumps({"ok": True, "shuffled_ids": ids})
 
     @pyqtSlot(str, result=str)
+    @_profiled
     def duplicate_session(self, sid):
-        data = self.sessions.load()
-        existing = next((s for s in data["sessions"] if str(s.get("id")) == str(sid)), None)
+        existing = self.sessions.get(sid)
         if not existing: return json.dumps({"ok": False})
-        import time
         new_session = json.loads(json.dumps(existing))
         new_session["id"] = str(int(time.time() * 1000))
         new_session["name"] += " (Copy)"
-        data["sessions"].append(new_session)
-        self.sessions.save(data)
+        self.sessions.upsert(new_session["id"], new_session)
         return json.dumps({"ok": True})
 
     def _load_page(self, name):
@@ -318,8 +670,11 @@ class Bridge(QObject):
             if p: self.parent().web_view.load(QUrl.fromLocalFile(str(p)))
 
     @pyqtSlot()
+    @_profiled
     def load_home_page(self): self._load_page("index.html")
     @pyqtSlot()
+    @_profiled
     def load_sessions_page(self): self._load_page("sessions.html")
     @pyqtSlot()
+    @_profiled
     def load_settings_page(self): self._load_page("setting.html")
\ No newline at end of file
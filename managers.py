@@ -1,10 +1,17 @@
+import heapq
 import json
+import mmap
+import os
+import struct
 import time
 import traceback
 from pathlib import Path
+from array import array
+from bisect import bisect_left, bisect_right
 from typing import Dict, Any, List
 from datetime import date
-from aqt import mw
+from aqt import mw, gui_hooks
+from aqt.qt import QTimer
 
 DEFAULT_SETTINGS = {
     "theme": "green",
@@ -22,109 +29,1242 @@ DEFAULT_SETTINGS = {
     "movable": True,
     "zoomLevel": 1.0,
     "windowSizePreset": "medium",
-    "language": "en"
+    "language": "en",
+    "singlePageMode": True,
+    "preloadOnStartup": False,
+    "perfStats": False
 }
 
 class SettingsManager:
+    """config.json settings served from memory. load() revalidates against the
+    file's mtime; get() is a plain dict lookup for hot paths. Subscribers are
+    called with {key: new_value} whenever values change."""
     def __init__(self, settings_path: Path):
         self.settings_path = settings_path
+        self._cache = None
+        self._mtime = None
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def _mtime_now(self):
+        try: return self.settings_path.stat().st_mtime
+        except OSError: return 0
+
+    def _apply(self, settings: Dict[str, Any]):
+        old, self._cache = self._cache, settings
+        if old is None: return
+        changed = {k: v for k, v in settings.items() if old.get(k) != v}
+        if not changed: return
+        for callback in self._subscribers:
+            try: callback(changed)
+            except Exception: traceback.print_exc()
 
     def load(self) -> Dict[str, Any]:
-        settings = DEFAULT_SETTINGS.copy()
-        try:
-            if self.settings_path.exists():
-                raw = self.settings_path.read_text(encoding="utf-8")
-                if raw.strip():
-                    loaded = json.loads(raw)
-                    settings.update(loaded)
-        except Exception:
-            pass
-        return settings
+        mtime = self._mtime_now()
+        if self._cache is None or mtime != self._mtime:
+            settings = DEFAULT_SETTINGS.copy()
+            try:
+                if mtime:
+                    raw = self.settings_path.read_text(encoding="utf-8")
+                    if raw.strip():
+                        loaded = json.loads(raw)
+                        settings.update(loaded)
+            except Exception:
+                pass
+            self._mtime = mtime
+            self._apply(settings)
+        return dict(self._cache)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if self._cache is None: self.load()
+        return self._cache.get(key, default)
 
     def save(self, settings: Dict[str, Any]):
         try:
-            self.settings_path.parent.mkdir(parents=True, exist_ok=True)
-            self.settings_path.write_text(json.dumps(settings, indent=4), encoding="utf-8")
+            atomic_write_text(self.settings_path, json.dumps(settings, indent=4))
+            self._mtime = self._mtime_now()
+            self._apply(dict(DEFAULT_SETTINGS, **settings))
         except Exception:
             traceback.print_exc()
 
+def atomic_write_text(path: Path, text: str):
+    """Write to a sibling temp file and rename it over `path`, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
 class SessionManager:
+    """sessions.json store. Sessions are indexed in memory by id and by folder,
+    which is canonical; the file is only the serialization. Saves are coalesced
+    for FLUSH_DELAY_MS and written atomically as compact JSON."""
+    FLUSH_DELAY_MS = 750
+
     def __init__(self, sessions_path: Path):
         self.sessions_path = sessions_path
-        self._cache = None
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_folder: Dict[str, Dict[str, None]] = {}
+        self._folders: Dict[str, None] = {}
+        self._active_id = None
+        self._loaded = False
         self._mtime = 0
+        self._dirty = False
+        self._timer = None
+        self.write_count = 0
+        # Bumped on every change to the in-memory sessions, so readers can skip re-checking them
+        self.revision = 0
 
-    def load(self) -> Dict[str, Any]:
-        try:
-            if not self.sessions_path.exists():
-                return {"sessions": [], "active_session_id": None, "folders": []}
+    def install_hooks(self):
+        gui_hooks.profile_will_close.append(self.flush)
 
-            try:
-                current_mtime = self.sessions_path.stat().st_mtime
-            except:
-                current_mtime = 0
-
-            if self._cache is not None and current_mtime == self._mtime:
-                return self._cache
-
-            raw = self.sessions_path.read_text(encoding="utf-8")
-            data = json.loads(raw) if raw.strip() else {}
-            
-            # Normalize data
-            data.setdefault("sessions", [])
-            data.setdefault("active_session_id", None)
-            data.setdefault("folders", [])
-            for s in data["sessions"]:
-                if isinstance(s, dict):
-                    s.setdefault("folder", "")
-            
-            self._cache = data
-            self._mtime = current_mtime
-            return data
+    # -- indexing --
+
+    def _index(self, session: Dict[str, Any]):
+        sid = str(session.get("id"))
+        self._by_id[sid] = session
+        self._by_folder.setdefault(session.get("folder", ""), {})[sid] = None
+
+    def _unindex(self, sid: str) -> Dict[str, Any] | None:
+        session = self._by_id.pop(sid, None)
+        if session is not None:
+            members = self._by_folder.get(session.get("folder", ""), {})
+            members.pop(sid, None)
+        return session
+
+    def _refolder(self, sid: str, session: Dict[str, Any], folder: str):
+        self._by_folder.get(session.get("folder", ""), {}).pop(sid, None)
+        session["folder"] = folder
+        self._by_folder.setdefault(folder, {})[sid] = None
+
+    def _reindex(self, data: Dict[str, Any]):
+        self.revision += 1
+        self._by_id, self._by_folder = {}, {}
+        for session in data.get("sessions", []):
+            if isinstance(session, dict):
+                session.setdefault("folder", "")
+                self._index(session)
+        self._folders = dict.fromkeys(data.get("folders", []))
+        self._active_id = data.get("active_session_id")
+
+    def _ensure_loaded(self):
+        # Pending changes are newer than whatever is on disk
+        if self._dirty: return
+        try:
+            current_mtime = self.sessions_path.stat().st_mtime if self.sessions_path.exists() else 0
+        except:
+            current_mtime = 0
+        if self._loaded and current_mtime == self._mtime: return
+        data = {}
+        try:
+            if current_mtime:
+                raw = self.sessions_path.read_text(encoding="utf-8")
+                data = json.loads(raw) if raw.strip() else {}
         except Exception:
-            return {"sessions": [], "active_session_id": None, "folders": []}
+            data = {}
+        self._reindex(data)
+        self._loaded = True
+        self._mtime = current_mtime
+
+    # -- reads --
+
+    def load(self) -> Dict[str, Any]:
+        self._ensure_loaded()
+        return {
+            "sessions": list(self._by_id.values()),
+            "active_session_id": self._active_id,
+            "folders": list(self._folders),
+        }
+
+    def get(self, sid) -> Dict[str, Any] | None:
+        self._ensure_loaded()
+        return self._by_id.get(str(sid))
+
+    # -- mutations --
+
+    def upsert(self, sid: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        self._ensure_loaded()
+        sid = str(sid)
+        session = self._by_id.get(sid)
+        if session is None:
+            session = dict(fields, id=sid)
+            session.setdefault("folder", "")
+            self._index(session)
+        else:
+            self._refolder(sid, session, fields.get("folder", session.get("folder", "")))
+            session.update(fields)
+        self._touch()
+        return session
+
+    def delete(self, sid) -> bool:
+        self._ensure_loaded()
+        if self._unindex(str(sid)) is None: return False
+        if str(self._active_id) == str(sid): self._active_id = None
+        self._touch()
+        return True
+
+    def set_active(self, sid):
+        self._ensure_loaded()
+        self._active_id = sid
+        self._touch()
+
+    def move_to_folder(self, sid, folder: str) -> bool:
+        session = self.get(sid)
+        if session is None: return False
+        self._refolder(str(sid), session, folder)
+        if folder: self._folders.setdefault(folder, None)
+        self._touch()
+        return True
+
+    def create_folder(self, name: str):
+        self._ensure_loaded()
+        if name in self._folders: return
+        self._folders[name] = None
+        self._touch()
+
+    def rename_folder(self, old: str, new: str):
+        self._ensure_loaded()
+        if old not in self._folders: return
+        self._folders = {(new if f == old else f): None for f in self._folders}
+        members = self._by_folder.pop(old, {})
+        for sid in members: self._by_id[sid]["folder"] = new
+        self._by_folder.setdefault(new, {}).update(members)
+        self._touch()
+
+    def delete_folder(self, name: str):
+        self._ensure_loaded()
+        if name not in self._folders: return
+        del self._folders[name]
+        members = self._by_folder.pop(name, {})
+        for sid in members: self._by_id[sid]["folder"] = ""
+        self._by_folder.setdefault("", {}).update(members)
+        self._touch()
 
     def save(self, data: Dict[str, Any]):
+        """Replace everything, e.g. on import."""
+        self._reindex(data)
+        self._loaded = True
+        self._touch()
+
+    # -- persistence --
+
+    def _touch(self):
+        self.revision += 1
+        self._dirty = True
+        if self._timer is None:
+            self._timer = QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self.flush)
+        self._timer.start(self.FLUSH_DELAY_MS)
+
+    def flush(self, *_):
+        if not self._dirty: return
         try:
-            self.sessions_path.parent.mkdir(parents=True, exist_ok=True)
-            self.sessions_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-            self._cache = data
+            atomic_write_text(self.sessions_path, json.dumps(self.load(), separators=(",", ":")))
             self._mtime = self.sessions_path.stat().st_mtime
+            self._dirty = False
+            self.write_count += 1
         except Exception:
             traceback.print_exc()
 
-class DeckManager:
-    @staticmethod
-    def get_deck_tree() -> Dict[str, Any]:
-        root = mw.col.sched.deck_due_tree()
-        def convert(node):
-            return {
+class DeckMetadataStore:
+    """deck_metadata.json: per-deck fields such as priority, keyed by deck id.
+    Served from memory and revalidated against the file's mtime by refresh(); each
+    deck's priority and rank are indexed alongside, so per-task lookups cost no stat."""
+    PRIORITIES = {"high": 0, "medium": 1, "low": 2}
+    DEFAULT_PRIORITY = "medium"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._decks: Dict[str, Dict[str, Any]] | None = None
+        self._priorities: Dict[int, str] = {}
+        self._ranks: Dict[int, int] = {}
+        self._mtime = None
+
+    def _mtime_now(self):
+        try: return self.path.stat().st_mtime
+        except OSError: return 0
+
+    def refresh(self):
+        """Reload the file if it changed on disk; priority() and rank() read what this last loaded."""
+        mtime = self._mtime_now()
+        if self._decks is not None and mtime == self._mtime: return
+        decks = {}
+        try:
+            if mtime:
+                raw = self.path.read_text(encoding="utf-8")
+                decks = json.loads(raw).get("decks", {}) if raw.strip() else {}
+        except Exception:
+            traceback.print_exc()
+        self._mtime = mtime
+        self._reindex(decks)
+
+    def _reindex(self, decks: Dict[str, Dict[str, Any]]):
+        self._decks = decks
+        self._priorities = {int(did): meta["priority"] for did, meta in decks.items()
+                            if meta.get("priority") in self.PRIORITIES}
+        self._ranks = {did: self.PRIORITIES[priority] for did, priority in self._priorities.items()}
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        self.refresh()
+        return self._decks
+
+    def priority(self, did: int) -> str:
+        return self._priorities.get(int(did), self.DEFAULT_PRIORITY)
+
+    def rank(self, did: int) -> int:
+        """Sort key for the deck's priority, high first."""
+        return self._ranks.get(int(did), self.PRIORITIES[self.DEFAULT_PRIORITY])
+
+    def update(self, did: int, fields: Dict[str, Any]):
+        if "priority" in fields and fields["priority"] not in self.PRIORITIES:
+            raise ValueError(f"unknown priority: {fields['priority']}")
+        self.refresh()
+        decks = dict(self._decks)
+        decks[str(int(did))] = dict(decks.get(str(int(did)), {}), **fields)
+        self._save(decks)
+
+    def merge(self, entries: Dict[str, Dict[str, Any]]) -> int:
+        """Add entries for decks without metadata yet, e.g. from the old localStorage copy."""
+        self.refresh()
+        decks = dict(self._decks)
+        added = 0
+        for did, meta in entries.items():
+            if not str(did).isdigit() or str(did) in decks or not isinstance(meta, dict): continue
+            if meta.get("priority") not in self.PRIORITIES: meta = {k: v for k, v in meta.items() if k != "priority"}
+            if not meta: continue
+            decks[str(did)] = meta
+            added += 1
+        if added: self._save(decks)
+        return added
+
+    def _save(self, decks: Dict[str, Dict[str, Any]]):
+        atomic_write_text(self.path, json.dumps({"decks": decks}, indent=2))
+        self._mtime = self._mtime_now()
+        self._reindex(decks)
+
+class DeckIndex:
+    """Deck id -> full name / child ids / descendants, built from one
+    all_names_and_ids() call and dropped only when the deck list can change."""
+    def __init__(self):
+        self._names = None
+        self._children = {}
+        self._descendants = {}
+        # Bumped by invalidate() so results read off-thread can be discarded
+        self.generation = 0
+
+    def install_hooks(self):
+        gui_hooks.state_did_undo.append(self.invalidate)
+        gui_hooks.sync_did_finish.append(self.invalidate)
+        gui_hooks.profile_did_open.append(self.invalidate)
+        gui_hooks.operation_did_execute.append(self._on_operation)
+
+    def _on_operation(self, changes, handler):
+        if changes.deck: self.invalidate()
+
+    def invalidate(self, *_):
+        self._names = None
+        self._children = {}
+        self._descendants = {}
+        self.generation += 1
+
+    def _ensure(self):
+        if self._names is None: self._build(mw.col.decks.all_names_and_ids())
+
+    def reader(self):
+        """(read, install) pair to build the index off the GUI thread, or None while it is current.
+        read(col) only queries the collection; install() runs back on the GUI thread."""
+        if self._names is not None: return None
+        generation = self.generation
+        def install(entries):
+            # Dropped if an invalidate() landed while the worker was reading
+            if self.generation == generation: self._build(entries)
+        return (lambda col: col.decks.all_names_and_ids()), install
+
+    def _build(self, entries):
+        names, by_name = {}, {}
+        for entry in entries:
+            names[entry.id] = entry.name
+            by_name[entry.name] = entry.id
+        children = {}
+        for did, name in names.items():
+            parent = by_name.get(name.rpartition("::")[0]) if "::" in name else None
+            # Top-level decks hang off the tree root, id 0
+            children.setdefault(0 if parent is None else parent, []).append(did)
+        self._names, self._children = names, children
+        self._descendants = {}
+
+    def names(self) -> Dict[int, str]:
+        """The id -> full name map; a new dict after every rebuild."""
+        self._ensure()
+        return self._names
+
+    def name(self, did: int):
+        """Full "Parent::Child" name, or None if the deck no longer exists."""
+        self._ensure()
+        return self._names.get(did)
+
+    def descendants(self, did: int) -> frozenset:
+        """All deck ids below `did`, computed once per deck per index build."""
+        self._ensure()
+        found = self._descendants.get(did)
+        if found is None:
+            found = set()
+            stack = list(self._children.get(did, ()))
+            while stack:
+                child = stack.pop()
+                found.add(child)
+                stack.extend(self._children.get(child, ()))
+            found = self._descendants[did] = frozenset(found)
+        return found
+
+    def subtree(self, did: int) -> List[List[int]]:
+        """[deck id, parent id] pairs below `did`, parents before their children."""
+        self._ensure()
+        out, stack = [], [(c, did) for c in reversed(self._children.get(did, ()))]
+        while stack:
+            child, parent = stack.pop()
+            out.append([child, parent])
+            stack.extend((c, child) for c in reversed(self._children.get(child, ())))
+        return out
+
+class DeckSearchIndex:
+    """Trigram postings over lower-cased full deck names, rebuilt whenever the
+    DeckIndex it reads from is. Terms of three or more characters intersect
+    posting lists; shorter ones have no trigram and are matched by a linear
+    substring scan of each deck's own name."""
+    FUZZY_RATIO = 0.5
+
+    def __init__(self, index: DeckIndex):
+        self.index = index
+        self._source = None
+        self._ids = []
+        self._names = []
+        self._leaves = []
+        self._grams = {}
+
+    def _ensure(self):
+        names = self.index.names()
+        if names is self._source: return
+        ids, lowered, leaves, grams = [], [], [], {}
+        for did, name in sorted(names.items(), key=lambda item: item[1].lower()):
+            pos = len(ids)
+            name = name.lower()
+            ids.append(did)
+            lowered.append(name)
+            leaves.append(name.rpartition("::")[2])
+            for gram in {name[i:i + 3] for i in range(len(name) - 2)}:
+                grams.setdefault(gram, []).append(pos)
+        self._ids, self._names, self._leaves, self._grams = ids, lowered, leaves, grams
+        self._source = names
+
+    def _candidates(self, term: str):
+        if len(term) < 3:
+            return {pos for pos, leaf in enumerate(self._leaves) if term in leaf}
+        lists = sorted((self._grams.get(term[i:i + 3], ()) for i in range(len(term) - 2)), key=len)
+        if not lists[0]: return set()
+        found = set(lists[0])
+        for postings in lists[1:]:
+            found.intersection_update(postings)
+            if not found: break
+        return {pos for pos in found if term in self._names[pos]}
+
+    def _fuzzy(self, terms: List[str]):
+        # Typo tolerance: enough shared trigrams, ranked by how many
+        grams = {t[i:i + 3] for t in terms for i in range(len(t) - 2)}
+        if not grams: return []
+        hits = {}
+        for gram in grams:
+            for pos in self._grams.get(gram, ()):
+                hits[pos] = hits.get(pos, 0) + 1
+        need = max(1, int(len(grams) * self.FUZZY_RATIO + 0.999))
+        return sorted((pos for pos, n in hits.items() if n >= need),
+                      key=lambda pos: (-hits[pos], len(self._names[pos]), pos))
+
+    def _score(self, pos: int, terms: List[str]) -> int:
+        leaf, score = self._leaves[pos], 0
+        for term in terms:
+            if leaf == term: continue
+            elif leaf.startswith(term): score += 1
+            elif " " + term in leaf: score += 2
+            elif term in leaf: score += 3
+            else: score += 4
+        return score
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Deck ids matching every word of `query`, best matches first."""
+        terms = query.lower().split()
+        if not terms or limit <= 0: return []
+        self._ensure()
+        found = None
+        for term in sorted(terms, key=len, reverse=True):
+            matches = self._candidates(term)
+            found = matches if found is None else found & matches
+            if not found: break
+        if found:
+            names = self._names
+            ranked = heapq.nsmallest(limit, found, key=lambda pos: (self._score(pos, terms), len(names[pos]), pos))
+        else:
+            ranked = self._fuzzy(terms)
+        return [self._ids[pos] for pos in ranked[:limit]]
+
+class DeckCountsCache:
+    """Lazily built deck_due_tree() view, dropped only when Anki reports a state change.
+
+    Answered cards are applied incrementally to the answered deck and its
+    ancestors; a full rebuild only happens on day rollover, sync, undo or
+    deck/option changes.
+    """
+    def __init__(self):
+        self._tree = None
+        self._tree_json = None
+        self._counts = None
+        self._nodes = {}
+        self._parents = {}
+        self._day = None
+        self.generation = 0
+
+    def install_hooks(self):
+        gui_hooks.state_did_undo.append(self.invalidate)
+        gui_hooks.sync_did_finish.append(self.invalidate)
+        gui_hooks.profile_did_open.append(self.invalidate)
+        gui_hooks.operation_did_execute.append(self._on_operation)
+
+    def _on_operation(self, changes, handler):
+        from aqt.reviewer import Reviewer
+        # Answers from the reviewer are applied through apply_answer()
+        if isinstance(handler, Reviewer): return
+        if changes.study_queues or changes.deck or changes.deck_config:
+            self.invalidate()
+
+    def invalidate(self, *_):
+        self._tree = None
+        self._tree_json = None
+        self._counts = None
+        self._nodes = {}
+        self._parents = {}
+        self.generation += 1
+
+    def _ensure(self):
+        today = mw.col.sched.today
+        if self._tree is None or self._day != today: self._build(mw.col.sched.deck_due_tree(), today)
+
+    def reader(self):
+        """(read, install) pair to build the tree off the GUI thread, or None while it is current."""
+        today = mw.col.sched.today
+        if self._tree is not None and self._day == today: return None
+        generation = self.generation
+        def install(root):
+            if self.generation == generation: self._build(root, today)
+        return (lambda col: col.sched.deck_due_tree()), install
+
+    def _build(self, root, today: int):
+        counts, nodes, parents = {}, {}, {}
+        def convert(node, parent_id=None):
+            counts[node.deck_id] = node.review_count + node.learn_count + node.new_count
+            parents[node.deck_id] = parent_id
+            nodes[node.deck_id] = {
                 "name": node.name,
                 "id": node.deck_id,
                 "review": node.review_count,
                 "learn": node.learn_count,
                 "new": node.new_count,
-                "children": [convert(c) for c in node.children],
+                "children": [convert(c, node.deck_id) for c in node.children],
             }
-        return convert(root)
+            return nodes[node.deck_id]
+        self._tree = convert(root)
+        self._tree_json = None
+        self._counts = counts
+        self._nodes = nodes
+        self._parents = parents
+        self._day = today
+
+    def apply_answer(self, card) -> List[int]:
+        """Adjust cached counts after `card` was answered; returns the deck ids touched."""
+        if self._tree is None or self._day != mw.col.sched.today:
+            self.invalidate()
+            return []
+        # Intraday learning cards due before the cutoff stay in today's count
+        cutoff = getattr(mw.col.sched, "day_cutoff", None) or getattr(mw.col.sched, "dayCutoff", 0)
+        if card.queue == 1 and card.due < cutoff: return []
+        if card.queue == 3 and card.due <= self._day: return []
+        field = {0: "new", 1: "learn", 3: "learn"}.get(card.type, "review")
+        touched, did = [], card.did
+        while did is not None and did in self._counts:
+            if self._counts[did] > 0:
+                self._counts[did] -= 1
+                node = self._nodes[did]
+                key = field if node[field] > 0 else next((k for k in ("review", "learn", "new") if node[k] > 0), field)
+                node[key] = max(node[key] - 1, 0)
+            touched.append(did)
+            did = self._parents.get(did)
+        self._tree_json = None
+        return touched
+
+    def ancestors(self, did: int):
+        """Yield `did` and each of its parents, using the last built tree."""
+        self._ensure()
+        while did is not None and did in self._parents:
+            yield did
+            did = self._parents[did]
+
+    def node(self, did: int):
+        self._ensure()
+        return self._nodes.get(did)
+
+    def tree_json(self) -> str:
+        self._ensure()
+        if self._tree_json is None: self._tree_json = json.dumps(self._tree)
+        return self._tree_json
+
+    def counts(self) -> Dict[int, int]:
+        self._ensure()
+        return self._counts
+
+class ReviewStatsManager:
+    """Today's revlog aggregates, cached until the next answered card, undo or sync."""
+    def __init__(self):
+        self._range = None
+        self._totals = None
+        self._by_deck = None
+        self.generation = 0
+
+    def install_hooks(self):
+        gui_hooks.reviewer_did_answer_card.append(self.invalidate)
+        gui_hooks.state_did_undo.append(self.invalidate)
+        gui_hooks.sync_did_finish.append(self.invalidate)
+        gui_hooks.profile_did_open.append(self.invalidate)
+
+    def invalidate(self, *_):
+        self._totals = None
+        self._by_deck = None
+        self.generation += 1
+
+    def _check_range(self, start: int, end: int):
+        if self._range != (start, end):
+            self.invalidate()
+            self._range = (start, end)
 
     @staticmethod
-    def get_deck_counts_map() -> Dict[int, int]:
-        root = mw.col.sched.deck_due_tree()
-        counts = {}
-        def traverse(node):
-            counts[node.deck_id] = node.review_count + node.learn_count + node.new_count
-            for child in node.children:
-                traverse(child)
-        traverse(root)
-        return counts
+    def _query_totals(db, start: int, end: int):
+        return db.first(
+            "SELECT COUNT(*), COUNT(DISTINCT cid), COALESCE(SUM(time), 0) FROM revlog WHERE id >= ? AND id < ?",
+            start, end)
 
     @staticmethod
-    def ensure_snapshot(selected_dids: List[int], current_counts: Dict[int, int]) -> Dict[str, int]:
-        if mw.col.get_config("anki_task_bar_day") != mw.col.sched.today:
-            snapshot = {str(did): current_counts.get(did, 0) for did in selected_dids}
-            mw.col.set_config("anki_task_bar_day", mw.col.sched.today)
-            mw.col.set_config("anki_task_bar_snapshot", snapshot)
+    def _query_by_deck(db, start: int, end: int):
+        return db.all(
+            "SELECT c.did, COUNT(*), COUNT(DISTINCT r.cid), COALESCE(SUM(r.time), 0) "
+            "FROM revlog r JOIN cards c ON c.id = r.cid WHERE r.id >= ? AND r.id < ? GROUP BY c.did",
+            start, end)
+
+    def _set_totals(self, row):
+        reviews, cards, time_ms = row
+        self._totals = {"total_cards": int(cards or 0), "total_reviews": int(reviews or 0), "total_time_ms": int(time_ms or 0)}
+
+    def _set_by_deck(self, rows, ancestors):
+        by_deck = {}
+        for did, reviews, cards, time_ms in rows:
+            for aid in ancestors(did):
+                t = by_deck.setdefault(aid, {"total_cards": 0, "total_reviews": 0, "total_time_ms": 0})
+                t["total_cards"] += int(cards)
+                t["total_reviews"] += int(reviews)
+                t["total_time_ms"] += int(time_ms)
+        self._by_deck = by_deck
+
+    def totals(self, start: int, end: int) -> Dict[str, int]:
+        self._check_range(start, end)
+        if self._totals is None: self._set_totals(self._query_totals(mw.col.db, start, end))
+        return self._totals
+
+    def by_deck(self, start: int, end: int, ancestors) -> Dict[int, Dict[str, int]]:
+        """Per-deck totals rolled up into parent decks, matching deck_due_tree counts."""
+        self._check_range(start, end)
+        if self._by_deck is None: self._set_by_deck(self._query_by_deck(mw.col.db, start, end), ancestors)
+        return self._by_deck
+
+    def totals_reader(self, start: int, end: int):
+        """(read, install) pair to fill totals() off the GUI thread, or None while cached."""
+        self._check_range(start, end)
+        if self._totals is not None: return None
+        generation = self.generation
+        def install(row):
+            if self.generation == generation: self._set_totals(row)
+        return (lambda col: self._query_totals(col.db, start, end)), install
+
+    def by_deck_reader(self, start: int, end: int, ancestors):
+        """(read, install) pair to fill by_deck() off the GUI thread; the roll-up runs in install."""
+        self._check_range(start, end)
+        if self._by_deck is not None: return None
+        generation = self.generation
+        def install(rows):
+            if self.generation == generation: self._set_by_deck(rows, ancestors)
+        return (lambda col: self._query_by_deck(col.db, start, end)), install
+
+class DueForecast:
+    """Review and learning cards due on each of the next days, per deck and rolled
+    up into parent decks. One grouped scan of the cards table, binned by SQLite,
+    cached for the day until cards change. New cards and daily limits are not counted."""
+    MIN_DAYS = 14
+
+    def __init__(self):
+        self._key = None
+        self._by_deck = None
+        self.generation = 0
+
+    def install_hooks(self):
+        gui_hooks.reviewer_did_answer_card.append(self.invalidate)
+        gui_hooks.state_did_undo.append(self.invalidate)
+        gui_hooks.sync_did_finish.append(self.invalidate)
+        gui_hooks.profile_did_open.append(self.invalidate)
+        gui_hooks.operation_did_execute.append(self._on_operation)
+
+    def _on_operation(self, changes, handler):
+        if changes.card or changes.deck: self.invalidate()
+
+    def invalidate(self, *_):
+        self._by_deck = None
+        self.generation += 1
+
+    def _current(self, today: int, days: int) -> bool:
+        return self._by_deck is not None and self._key[0] == today and self._key[1] >= days
+
+    @staticmethod
+    def _query(db, today: int, cutoff: int, horizon: int):
+        # Intraday learning (queue 1) is due by timestamp, reviews (2) and day learning (3) by day number
+        return db.all(
+            "SELECT did, CASE WHEN queue = 1 THEN (CASE WHEN due < ? THEN 0 ELSE (due - ?) / 86400 + 1 END) "
+            "ELSE MAX(due - ?, 0) END AS day, COUNT(*) FROM cards WHERE queue IN (1, 2, 3) "
+            "GROUP BY did, day HAVING day < ?",
+            cutoff, cutoff, today, horizon)
+
+    def _set(self, rows, ancestors, today: int, horizon: int):
+        by_deck = {}
+        for did, day, count in rows:
+            for aid in ancestors(did):
+                bins = by_deck.get(aid)
+                if bins is None: bins = by_deck[aid] = [0] * horizon
+                bins[day] += count
+        self._by_deck, self._key = by_deck, (today, horizon)
+
+    def _ensure(self, days: int, ancestors):
+        today, cutoff = mw.col.sched.today, mw.col.sched.day_cutoff
+        if self._current(today, days): return
+        horizon = max(days, self.MIN_DAYS)
+        self._set(self._query(mw.col.db, today, cutoff, horizon), ancestors, today, horizon)
+
+    def reader(self, days: int, ancestors):
+        """(read, install) pair to fill the forecast off the GUI thread, or None while cached."""
+        today, cutoff = mw.col.sched.today, mw.col.sched.day_cutoff
+        if self._current(today, days): return None
+        horizon, generation = max(days, self.MIN_DAYS), self.generation
+        def install(rows):
+            if self.generation == generation: self._set(rows, ancestors, today, horizon)
+        return (lambda col: self._query(col.db, today, cutoff, horizon)), install
+
+    def forecast(self, dids, days: int, ancestors) -> Dict[int, List[int]]:
+        """Due counts for today and the next `days` - 1 days, per deck including its subdecks."""
+        self._ensure(days, ancestors)
+        empty = [0] * days
+        return {did: self._by_deck.get(did, empty)[:days] for did in dids}
+
+    def total(self, dids, days: int, ancestors) -> List[int]:
+        """Summed forecast of `dids`, counting a deck once even if a parent is listed too."""
+        self._ensure(days, ancestors)
+        dids = set(dids)
+        out = [0] * days
+        for did in dids:
+            if any(aid in dids for aid in list(ancestors(did))[1:]): continue
+            for day, count in enumerate(self._by_deck.get(did, ())[:days]): out[day] += count
+        return out
+
+class SnapshotStore:
+    """Today's per-deck start and done counts, held in memory and written back
+    to the collection config in one batch: on day rollover, on profile close,
+    or FLUSH_DELAY_MS after the last change. A finished day is handed to
+    `archive` (a HistoryArchive) before it is replaced."""
+    DAY_KEY = "anki_task_bar_day"
+    SNAPSHOT_KEY = "anki_task_bar_snapshot"
+    DONE_KEY = "anki_task_bar_done"
+    FLUSH_DELAY_MS = 30000
+
+    def __init__(self, archive=None):
+        self.archive = archive
+        self._day = None
+        self._snapshot = None
+        self._done = None
+        self._seeded = False
+        self._dirty = False
+        self._timer = None
+        # Bumped whenever a start count changes or the day's snapshot is replaced
+        self.revision = 0
+
+    def install_hooks(self):
+        gui_hooks.profile_will_close.append(self.flush)
+        gui_hooks.profile_did_open.append(self.reset)
+
+    def reset(self, *_):
+        self._day = None
+        self._snapshot = None
+        self._done = None
+        self._dirty = False
+
+    def _ensure(self):
+        today = mw.col.sched.today
+        if self._snapshot is not None and self._day == today: return
+        # Day rollover: persist what the previous day ended with first
+        self.flush()
+        stored_day = mw.col.get_config(self.DAY_KEY, None)
+        if stored_day == today:
+            self._snapshot = dict(mw.col.get_config(self.SNAPSHOT_KEY, {}))
+            self._done = dict(mw.col.get_config(self.DONE_KEY, {}))
+            self._seeded = True
+        else:
+            if stored_day is not None and self.archive is not None:
+                try:
+                    self.archive.append_day(stored_day, mw.col.get_config(self.SNAPSHOT_KEY, {}),
+                                            mw.col.get_config(self.DONE_KEY, {}))
+                except Exception:
+                    traceback.print_exc()
+            self._snapshot = {}
+            self._done = {}
+            self._seeded = False
+        self._day = today
+        self.revision += 1
+
+    def get(self) -> Dict[str, int]:
+        self._ensure()
+        return self._snapshot
+
+    def ensure_day(self, selected_dids: List[int], current_counts: Dict[int, int]) -> Dict[str, int]:
+        """Today's snapshot, seeded from `current_counts` on the first call of a new day."""
+        self._ensure()
+        if not self._seeded:
+            for did in selected_dids:
+                self._snapshot.setdefault(str(did), current_counts.get(did, 0))
+            self._seeded = True
+            self.revision += 1
+            self._touch()
+        return self._snapshot
+
+    def raise_start(self, did: int, start: int):
+        self._ensure()
+        if start > self._snapshot.get(str(did), 0):
+            self._snapshot[str(did)] = start
+            self.revision += 1
+            self._touch()
+
+    def setdefault(self, did: int, start: int):
+        self._ensure()
+        if str(did) not in self._snapshot:
+            self._snapshot[str(did)] = start
+            self.revision += 1
+            self._touch()
+
+    def record_done(self, did: int, done: int):
+        self._ensure()
+        if self._done.get(str(did)) != done:
+            self._done[str(did)] = done
+            self._touch()
+
+    def _touch(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self.flush)
+        self._timer.start(self.FLUSH_DELAY_MS)
+
+    def flush(self, *_):
+        if not self._dirty or mw.col is None: return
+        try:
+            mw.col.set_config(self.DAY_KEY, self._day)
+            mw.col.set_config(self.SNAPSHOT_KEY, self._snapshot)
+            mw.col.set_config(self.DONE_KEY, self._done)
             mw.col.setMod()
-            return snapshot
-        return mw.col.get_config("anki_task_bar_snapshot", {})
+            self._dirty = False
+        except Exception:
+            traceback.print_exc()
+
+class HistoryArchive:
+    """Append-only archive of per-deck start/done counts, one block per day.
+
+    Days are collection-relative, so each profile gets its own pair of files
+    in `directory`: `<profile>.bin` holds each day as three packed columns
+    (deck ids as int64, start and done as int32); `<profile>.idx` holds one
+    (day, offset, count) record per block. Reads bisect the in-memory index
+    and slice a memory map of the data file, so a query only touches the
+    days it asks for."""
+    INDEX = struct.Struct("<iQI")
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._profile = None
+        self.data_path = None
+        self.index_path = None
+        self._days = None
+        self._offsets = None
+        self._counts = None
+        self._map = None
+
+    def _load_index(self):
+        profile = mw.pm.name
+        if profile != self._profile:
+            # Switched profiles: drop the other profile's index and mapping
+            self.close()
+            self._profile, self._days = profile, None
+            self.data_path = self.directory / f"{profile}.bin"
+            self.index_path = self.directory / f"{profile}.idx"
+        if self._days is not None: return
+        self._days, self._offsets, self._counts = array("i"), array("Q"), array("I")
+        try: raw = self.index_path.read_bytes()
+        except FileNotFoundError: return
+        raw = raw[:len(raw) - len(raw) % self.INDEX.size]
+        for day, offset, count in self.INDEX.iter_unpack(raw):
+            self._days.append(day)
+            self._offsets.append(offset)
+            self._counts.append(count)
+
+    def _end(self) -> int:
+        if not self._days: return 0
+        return self._offsets[-1] + self._counts[-1] * 16
+
+    def _mapped(self):
+        if self._map is None:
+            if not self._days: return None
+            with open(self.data_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def append_day(self, day: int, starts: Dict[str, int], dones: Dict[str, int]) -> bool:
+        """Archive one finished day; days at or before the last archived one are ignored."""
+        self._load_index()
+        if self._days and day <= self._days[-1]: return False
+        dids, start_col, done_col = array("q"), array("i"), array("i")
+        for key, start in starts.items():
+            done = int(dones.get(key, 0))
+            if not start and not done: continue
+            dids.append(int(key))
+            start_col.append(int(start))
+            done_col.append(done)
+        if not dids: return False
+        offset = self._end()
+        self.close()
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.data_path, "ab") as f:
+            # Drop any tail left by a write that never made it into the index
+            f.truncate(offset)
+            f.write(dids.tobytes() + start_col.tobytes() + done_col.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.index_path, "ab") as f:
+            f.truncate(len(self._days) * self.INDEX.size)
+            f.write(self.INDEX.pack(day, offset, len(dids)))
+            f.flush()
+            os.fsync(f.fileno())
+        self._days.append(day)
+        self._offsets.append(offset)
+        self._counts.append(len(dids))
+        return True
+
+    def days(self, start_day: int, end_day: int):
+        """Yield (day, dids, starts, dones) column arrays for archived days in [start_day, end_day]."""
+        self._load_index()
+        lo, hi = bisect_left(self._days, start_day), bisect_right(self._days, end_day)
+        if lo >= hi: return
+        view = self._mapped()
+        for i in range(lo, hi):
+            offset, n = self._offsets[i], self._counts[i]
+            dids, starts, dones = array("q"), array("i"), array("i")
+            dids.frombytes(view[offset:offset + n * 8])
+            starts.frombytes(view[offset + n * 8:offset + n * 12])
+            dones.frombytes(view[offset + n * 12:offset + n * 16])
+            yield self._days[i], dids, starts, dones
+
+    def totals(self, start_day: int, end_day: int, dids=None) -> List[dict]:
+        """Per-day start/done sums over `dids` (all archived decks if None)."""
+        wanted = None if dids is None else {int(d) for d in dids}
+        out = []
+        for day, day_dids, starts, dones in self.days(start_day, end_day):
+            start = done = 0
+            for i, did in enumerate(day_dids):
+                if wanted is None or did in wanted:
+                    start += starts[i]
+                    done += dones[i]
+            if wanted is not None and not start and not done: continue
+            out.append({"day": day, "start": start, "done": done,
+                        "rate": 1.0 if start == 0 else round(min(done / start, 1.0), 3)})
+        return out
+
+    def streak(self, end_day: int, dids=None) -> int:
+        """Consecutive archived days ending at `end_day` on which every deck was finished."""
+        self._load_index()
+        stop = bisect_right(self._days, end_day)
+        count, expected = 0, end_day
+        for i in range(stop - 1, -1, -1):
+            if self._days[i] != expected: break
+            day = self.totals(expected, expected, dids)
+            if not day or day[0]["done"] < day[0]["start"]: break
+            count += 1
+            expected -= 1
+        return count
+
+class DeckManager:
+    def __init__(self):
+        self.cache = DeckCountsCache()
+        self.index = DeckIndex()
+        self.search_index = DeckSearchIndex(self.index)
+
+    def get_deck_counts_map(self) -> Dict[int, int]:
+        return self.cache.counts()
+
+    def _row(self, node) -> Dict[str, Any]:
+        did = node["id"]
+        return {
+            "id": did, "name": node["name"], "fullName": self.index.name(did) or node["name"],
+            "review": node["review"], "learn": node["learn"], "new": node["new"],
+            "children": len(node["children"]), "descendants": len(self.index.descendants(did)),
+        }
+
+    def children_page(self, parent_id: int, offset: int, limit: int) -> Dict[str, Any]:
+        """One page of a deck's direct children with their counts; the root is id 0."""
+        node = self.cache.node(parent_id)
+        kids = node["children"] if node else []
+        offset = max(offset, 0)
+        return {"parent": parent_id, "offset": offset, "total": len(kids),
+                "items": [self._row(c) for c in kids[offset:offset + max(limit, 0)]]}
+
+    def paths(self, dids) -> Dict[str, List[int]]:
+        """Ancestor ids (top-down, root excluded) for each deck id; ids not in the tree are left out."""
+        out = {}
+        for did in dids:
+            if self.cache.node(int(did)) is None: continue
+            chain = list(self.cache.ancestors(int(did)))[1:]
+            out[str(did)] = [a for a in reversed(chain) if a]
+        return out
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Ranked search_index matches as picker rows, with counts and ancestor path."""
+        out = []
+        for did in self.search_index.search(query, limit):
+            node = self.cache.node(did)
+            if node is None: continue
+            row = self._row(node)
+            row["path"] = self.paths([did])[str(did)]
+            out.append(row)
+        return out
+
+class SessionStatsIndex:
+    """Session progress kept current incrementally. A reverse index from deck id
+    to the sessions listing it holds running (start, done) sums per session, so
+    a changed deck only touches the sessions that contain it."""
+    def __init__(self):
+        self._decks: Dict[str, tuple] = {}               # session id -> its deck ids
+        self._by_deck: Dict[int, Dict[str, int]] = {}     # deck id -> {session id: times listed}
+        self._values: Dict[int, tuple] = {}               # deck id -> (start, done)
+        self._sums: Dict[str, List[int]] = {}             # session id -> [start, done]
+        self._counts = None
+        self._snapshot_rev = None
+        self._sessions_rev = None
+        self._stale = set()
+
+    def mark_decks(self, dids):
+        """Counts of `dids` changed in place, e.g. after an answered card."""
+        self._stale.update(dids)
+
+    @staticmethod
+    def _value(did: int, counts: Dict[int, int], snapshot: Dict[str, int]) -> tuple:
+        now = counts.get(did, 0)
+        start = max(int(snapshot.get(str(did), now)), now)
+        return start, start - now
+
+    def _add(self, sid: str, dids, counts, snapshot):
+        sums = self._sums[sid] = [0, 0]
+        self._decks[sid] = dids
+        for did in dids:
+            members = self._by_deck.setdefault(did, {})
+            members[sid] = members.get(sid, 0) + 1
+            value = self._values.get(did)
+            if value is None: value = self._values[did] = self._value(did, counts, snapshot)
+            sums[0] += value[0]
+            sums[1] += value[1]
+
+    def _remove(self, sid: str):
+        for did in set(self._decks.pop(sid, ())):
+            members = self._by_deck.get(did, {})
+            members.pop(sid, None)
+            if not members:
+                self._by_deck.pop(did, None)
+                self._values.pop(did, None)
+        self._sums.pop(sid, None)
+
+    def _update(self, did: int, value: tuple):
+        old = self._values.get(did)
+        if old is None or old == value: return
+        self._values[did] = value
+        d_start, d_done = value[0] - old[0], value[1] - old[1]
+        for sid, times in self._by_deck.get(did, {}).items():
+            sums = self._sums[sid]
+            sums[0] += d_start * times
+            sums[1] += d_done * times
+
+    def sync(self, sessions: List[Dict[str, Any]], sessions_rev, counts: Dict[int, int], snapshot: Dict[str, int], snapshot_rev):
+        # A rebuilt counts map or changed snapshot may move any deck; otherwise only marked ones
+        if counts is not self._counts or snapshot_rev != self._snapshot_rev:
+            stale, self._stale = set(self._by_deck), set()
+            self._counts, self._snapshot_rev = counts, snapshot_rev
+        else:
+            stale, self._stale = self._stale, set()
+        for did in stale:
+            if did in self._values: self._update(did, self._value(did, counts, snapshot))
+        if sessions_rev == self._sessions_rev: return
+        seen = set()
+        for s in sessions:
+            sid = str(s.get("id"))
+            seen.add(sid)
+            dids = tuple(s.get("deck_ids", []))
+            if self._decks.get(sid) == dids: continue
+            self._remove(sid)
+            self._add(sid, dids, counts, snapshot)
+        for sid in set(self._decks) - seen: self._remove(sid)
+        self._sessions_rev = sessions_rev
+
+    def stats(self, sid: str) -> Dict[str, Any]:
+        start, done = self._sums.get(str(sid), (0, 0))
+        return {
+            "progress": 1.0 if start == 0 else min(1.0, round(done / start, 3)),
+            "total_cards": start, "done_cards": done
+        }
+
+    def apply(self, sessions: List[Dict[str, Any]]):
+        for s in sessions:
+            s.update(self.stats(s.get("id")))
+
+class VersionedCollection:
+    """Last list of entries served by a slot, keyed by `key`, with a short change
+    log so a client holding an older version can be sent only what changed.
+    Versions are "<epoch>.<n>"; a fresh epoch per instance means a client that
+    outlived an add-on reload gets a full listing instead of a wrong delta."""
+    HISTORY = 64
+
+    def __init__(self, key: str):
+        self.key = key
+        self._epoch = f"{int(time.time() * 1000):x}"
+        self._n = 0
+        self._entries: Dict[str, str] = {}      # key -> encoded entry
+        self._order: List[str] = []
+        self._log: List[tuple] = []             # (n, changed keys, removed keys, reordered)
+
+    @property
+    def version(self) -> str:
+        return f"{self._epoch}.{self._n}"
+
+    def update(self, items: List[Dict[str, Any]]) -> str:
+        entries = {str(item[self.key]): json.dumps(item) for item in items}
+        order = list(entries)
+        changed = {k for k, v in entries.items() if self._entries.get(k) != v}
+        removed = set(self._entries) - set(entries)
+        reordered = order != self._order
+        if changed or removed or reordered:
+            self._n += 1
+            self._log.append((self._n, changed, removed, reordered))
+            del self._log[:-self.HISTORY]
+            self._entries, self._order = entries, order
+        return self.version
+
+    def _since(self, version: str):
+        epoch, _, n = (version or "").partition(".")
+        if epoch != self._epoch or not n.isdigit(): return None
+        n = int(n)
+        # Too old for the log, or from the future
+        if n > self._n or (n < self._n and (not self._log or self._log[0][0] > n + 1)): return None
+        return n
+
+    def delta(self, since: str) -> str:
+        """JSON {version, unchanged} / {version, full, items} / {version, changed, removed[, order]}."""
+        n = self._since(since)
+        head = '{"version": %s, ' % json.dumps(self.version)
+        if n == self._n: return head + '"unchanged": true}'
+        if n is None:
+            return head + '"full": true, "items": [' + ", ".join(self._entries[k] for k in self._order) + "]}"
+        changed, removed, reordered = set(), set(), False
+        for entry_n, entry_changed, entry_removed, entry_reordered in self._log:
+            if entry_n <= n: continue
+            changed |= entry_changed
+            removed |= entry_removed
+            reordered = reordered or entry_reordered
+        # Keys removed and re-added since are plain changes
+        removed = [k for k in removed if k not in self._entries]
+        items = [self._entries[k] for k in self._order if k in changed]
+        body = head + '"changed": [' + ", ".join(items) + "], " + '"removed": ' + json.dumps(removed)
+        if reordered: body += ', "order": ' + json.dumps(self._order)
+        return body + "}"
+
+class SlotProfiler:
+    """Opt-in per-slot call counts, latency histogram, payload sizes and swallowed errors."""
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+    MAX_ERRORS = 50
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self._since = time.time()
+        self._slots: Dict[str, Dict[str, Any]] = {}
+        self._errors: List[Dict[str, Any]] = []
+
+    def _slot(self, name: str) -> Dict[str, Any]:
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._slots[name] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "bytes": 0, "max_bytes": 0,
+                                        "errors": 0, "histogram": [0] * (len(self.BUCKETS_MS) + 1)}
+        return slot
+
+    def record(self, name: str, ms: float, result):
+        slot = self._slot(name)
+        size = len(result) if isinstance(result, str) else 0
+        slot["calls"] += 1
+        slot["total_ms"] += ms
+        slot["max_ms"] = max(slot["max_ms"], ms)
+        slot["bytes"] += size
+        slot["max_bytes"] = max(slot["max_bytes"], size)
+        slot["histogram"][bisect_left(self.BUCKETS_MS, ms)] += 1
+
+    def record_error(self, name: str):
+        """Record the exception currently being handled; call from inside an except block."""
+        self._slot(name)["errors"] += 1
+        self._errors.append({"slot": name, "time": time.time(), "error": traceback.format_exc(limit=4)})
+        del self._errors[:-self.MAX_ERRORS]
+
+    def _percentile(self, histogram: List[int], fraction: float):
+        # Upper bound of the bucket holding the given fraction of calls
+        target, seen = sum(histogram) * fraction, 0
+        for i, n in enumerate(histogram):
+            seen += n
+            if n and seen >= target:
+                return self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else None
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        slots = []
+        for name, slot in self._slots.items():
+            calls = slot["calls"]
+            slots.append(dict(slot, name=name,
+                              avg_ms=round(slot["total_ms"] / calls, 3) if calls else 0,
+                              p50_ms=self._percentile(slot["histogram"], 0.5),
+                              p95_ms=self._percentile(slot["histogram"], 0.95),
+                              avg_bytes=slot["bytes"] // calls if calls else 0,
+                              total_ms=round(slot["total_ms"], 3), max_ms=round(slot["max_ms"], 3)))
+        slots.sort(key=lambda s: s["total_ms"], reverse=True)
+        return {"enabled": self.enabled, "since": self._since, "buckets_ms": list(self.BUCKETS_MS),
+                "slots": slots, "errors": list(self._errors)}
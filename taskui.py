@@ -3,6 +3,7 @@ from aqt.qt import (
     QVBoxLayout,
     QUrl,
     QWebEngineView,
+    QWebEnginePage,
     QWebChannel,
     Qt,
     QMenu,
@@ -10,9 +11,11 @@ from aqt.qt import (
     QMouseEvent,
     QPoint,
     QPalette,
-    QEvent
+    QEvent,
+    QTimer
 )
 from pathlib import Path
+import time
 from aqt import mw
 from .bridge import Bridge
 
@@ -32,13 +35,30 @@ def find_web_file(start_dir: Path, filename: str, max_up: int = 10) -> Path | No
     return None
 
 
+def renderer_rss_kb(pid: int) -> int | None:
+    """Resident memory of a process in KiB, where /proc is available."""
+    if not pid: return None
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"): return int(line.split()[1])
+    except: return None
+    return None
+
+
 # -----------------------------
 # Draggable Frameless Window
 # -----------------------------
 
 class Taskbar(QWidget):
-    def __init__(self):
+    # Hidden pages are frozen at once and discarded (renderer memory released) after this long
+    DISCARD_AFTER_MS = 5 * 60 * 1000
+
+    def __init__(self, preloaded: bool = False):
         super().__init__()
+        # Startup cost is reported by Bridge.report_first_render
+        self.created_at = time.perf_counter()
+        self.preloaded = preloaded
+        self.first_render_ms = None
         self.setWindowTitle("Taskbar")
         self.resize(500, 600) # Smaller default size for a widget
 
@@ -110,6 +130,16 @@ class Taskbar(QWidget):
         self._expanded = False
         self._normal_size = self.size()
         
+        # Low-power mode while hidden, reported in the settings Diagnostics panel. A preloaded
+        # page is frozen only after its first render and never discarded before it was shown.
+        self._shown = False
+        self._freeze_after_render = False
+        self.power_stats = {"state": "active", "renderer_kb": None, "saved_kb": None, "discards": 0}
+        self._discard_timer = QTimer(self)
+        self._discard_timer.setSingleShot(True)
+        self._discard_timer.setInterval(self.DISCARD_AFTER_MS)
+        self._discard_timer.timeout.connect(self._discard_page)
+
         # Load settings
         self.load_settings()
 
@@ -137,10 +167,19 @@ class Taskbar(QWidget):
             self.movable = True
             self.set_always_on_top(False, force_show=False)
 
+        self.bridge.settings.subscribe(self._on_settings_changed)
+
         # Enable mouse tracking for dragging
         self.setMouseTracking(True)
         self.web_view.setMouseTracking(True)
 
+    def _on_settings_changed(self, changed):
+        """Apply window-level settings as soon as they change."""
+        if "movable" in changed:
+            self.movable = bool(changed["movable"])
+        if "alwaysOnTop" in changed:
+            self.set_always_on_top(bool(changed["alwaysOnTop"]), force_show=False)
+
     def set_always_on_top(self, enabled: bool, force_show: bool = True):
         """Update window flags to toggle always on top status."""
         current_flags = self.windowFlags()
@@ -171,6 +210,78 @@ class Taskbar(QWidget):
             self._expanded = False
 
 
+    # -----------------------------
+    # Hidden / Shown Lifecycle
+    # -----------------------------
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if event.spontaneous(): return  # Minimized; the page may still be seen in previews
+        # The web view is hidden only after this handler, and Qt won't freeze a visible page
+        QTimer.singleShot(0, self.enter_hidden_mode)
+
+    def enter_hidden_mode(self):
+        """Stop pushes, freeze the page and schedule its discard; used on hide and after preloading."""
+        if self.isVisible(): return
+        self.bridge.suspend()
+        if self.first_render_ms is None:
+            # Freezing now would stall the channel handshake and first get_state
+            self._freeze_after_render = True
+            return
+        page = self.web_view.page()
+        self.power_stats["renderer_kb"] = renderer_rss_kb(page.renderProcessPid())
+        try:
+            # Stops timers, animation frames and layout in the renderer
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+        except Exception as e: print(f"[Taskbar] Could not freeze page: {e}")
+        # Qt refuses some transitions with only a warning, so read the state back
+        if page.lifecycleState() == QWebEnginePage.LifecycleState.Frozen:
+            self.power_stats["state"] = "frozen"
+        # Discarding a preloaded page would make the first show a full reload again
+        if self._shown: self._discard_timer.start()
+
+    def on_first_render(self):
+        """Called by the bridge once the page has rendered its first state."""
+        if self._freeze_after_render:
+            self._freeze_after_render = False
+            # Not from inside the page's own slot call
+            QTimer.singleShot(0, self.enter_hidden_mode)
+
+    def _discard_page(self):
+        if self.isVisible() or not self._shown: return
+        page = self.web_view.page()
+        pid = page.renderProcessPid()
+        before = renderer_rss_kb(pid) or self.power_stats["renderer_kb"]
+        try: page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+        except Exception as e: return print(f"[Taskbar] Could not discard page: {e}")
+        self.power_stats["state"] = "discarded"
+        self.power_stats["discards"] += 1
+        # The renderer exits asynchronously (or stays up if another page shares it)
+        QTimer.singleShot(3000, lambda: self._report_saved(pid, before))
+
+    def _report_saved(self, pid: int, before: int | None):
+        if before is None: return
+        saved = before - (renderer_rss_kb(pid) or 0)
+        self.power_stats["saved_kb"] = saved
+        print(f"[Taskbar] Discarded hidden page, renderer memory released: {saved / 1024:.1f} MiB")
+
+    def power_report(self) -> dict:
+        if self.isVisible():
+            self.power_stats["renderer_kb"] = renderer_rss_kb(self.web_view.page().renderProcessPid())
+        return dict(self.power_stats)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._discard_timer.stop()
+        self._shown = True
+        self._freeze_after_render = False
+        page = self.web_view.page()
+        # A discarded page reloads itself on becoming active again
+        if page.lifecycleState() != QWebEnginePage.LifecycleState.Active:
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        self.power_stats["state"] = "active"
+        # Pushes one state if anything changed while hidden
+        self.bridge.resume()
+
     # -----------------------------
     # Drag & Resize Handling
     # -----------------------------
@@ -198,14 +309,8 @@ class Taskbar(QWidget):
         pass
 
     def mousePressEvent(self, event: QMouseEvent):
-        # Load settings from bridge
+        # Kept current by _on_settings_changed; no file I/O on clicks
         movable = self.movable
-        try:
-            cfg = self.bridge.settings.load()
-            movable = cfg.get("movable", True)
-            self.movable = movable
-        except: 
-            pass
 
         # Handle Dragging/Moving
         if event.button() == Qt.MouseButton.LeftButton and movable:
@@ -5,6 +5,14 @@
 window.AnkiTaskbar = {
     settings: {},
     translations: {},
+    views: {},
+    _listeners: [],
+    _signals: [],
+    _pageCache: {},
+    _loadedScripts: {},
+    _asyncPending: {},
+    _asyncEarly: {},
+    _asyncConnected: false,
 
     /**
      * Initialize QWebChannel and set up basic window functionality
@@ -29,6 +37,7 @@ window.AnkiTaskbar = {
 
                     self.setupWindowControls();
                     self.setupShortcuts();
+                    self.setupNavigation();
 
                     if (callback) callback(window.py);
                     resolve(window.py);
@@ -81,31 +90,201 @@ window.AnkiTaskbar = {
             // Ctrl/Cmd + H: Home
             if ((e.ctrlKey || e.metaKey) && e.key === 'h') {
                 e.preventDefault();
-                if (window.py) window.py.load_home_page();
+                AnkiTaskbar.navigate('index.html');
             }
             // Ctrl/Cmd + S: Sessions
             else if ((e.ctrlKey || e.metaKey) && e.key === 's') {
                 e.preventDefault();
-                if (window.py) window.py.load_sessions_page();
+                AnkiTaskbar.navigate('sessions.html');
             }
             // Ctrl/Cmd + ,: Settings
             else if ((e.ctrlKey || e.metaKey) && e.key === ',') {
                 e.preventDefault();
-                if (window.py) window.py.load_settings_page();
+                AnkiTaskbar.navigate('setting.html');
             }
             // Escape: Back to Home (if not in input)
             else if (e.key === 'Escape' && !isInput) {
-                if (window.py) window.py.load_home_page();
+                AnkiTaskbar.navigate('index.html');
             }
         });
     },
 
+    /**
+     * Register a page's setup function. On a normal page load it runs once the
+     * DOM is ready; in single-page mode navigate() runs it after swapping views.
+     * @param {string} name - Page name without extension (e.g. 'index')
+     * @param {Function} mount
+     */
+    registerView: function (name, mount) {
+        this.views[name] = mount;
+        if (this._spaActive) return;
+        if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', mount);
+        else mount();
+    },
+
+    /**
+     * addEventListener that is undone when navigate() leaves the current view
+     */
+    listen: function (target, type, fn, options) {
+        target.addEventListener(type, fn, options);
+        this._listeners.push([target, type, fn, options]);
+    },
+
+    /**
+     * Connect a backend signal for the lifetime of the current view
+     */
+    connectSignal: function (signal, fn) {
+        if (!signal) return;
+        signal.connect(fn);
+        this._signals.push([signal, fn]);
+    },
+
+    _unmountView: function () {
+        for (var i = 0; i < this._listeners.length; i++) {
+            var l = this._listeners[i];
+            l[0].removeEventListener(l[1], l[2], l[3]);
+        }
+        for (var i = 0; i < this._signals.length; i++) {
+            this._signals[i][0].disconnect(this._signals[i][1]);
+        }
+        this._listeners = [];
+        this._signals = [];
+    },
+
+    /**
+     * Route same-folder .html links through navigate()
+     */
+    setupNavigation: function () {
+        var self = this;
+        document.addEventListener('click', function (e) {
+            var a = e.target.closest ? e.target.closest('a[href]') : null;
+            if (!a) return;
+            var href = a.getAttribute('href');
+            if (!/^[\w-]+\.html(\?.*)?$/.test(href)) return;
+            e.preventDefault();
+            self.navigate(href);
+        });
+    },
+
+    _fetchPage: function (page, callback) {
+        var self = this;
+        if (this._pageCache[page]) return callback(this._pageCache[page]);
+        var xhr = new XMLHttpRequest();
+        xhr.open('GET', page, true);
+        xhr.onreadystatechange = function () {
+            if (xhr.readyState !== 4) return;
+            // file:// requests report status 0 on success
+            if ((xhr.status === 200 || xhr.status === 0) && xhr.responseText) {
+                self._pageCache[page] = new DOMParser().parseFromString(xhr.responseText, 'text/html');
+                callback(self._pageCache[page]);
+            } else {
+                callback(null);
+            }
+        };
+        xhr.send();
+    },
+
+    _syncStylesheets: function (doc) {
+        var wanted = {};
+        var links = doc.querySelectorAll('link[rel="stylesheet"]');
+        for (var i = 0; i < links.length; i++) wanted[links[i].getAttribute('href')] = true;
+
+        var current = document.querySelectorAll('link[rel="stylesheet"]');
+        var present = {};
+        for (var i = 0; i < current.length; i++) {
+            var href = current[i].getAttribute('href');
+            present[href] = true;
+            // Disabled sheets stay parsed, so switching back costs nothing
+            current[i].disabled = !wanted[href];
+        }
+        for (var href in wanted) {
+            if (present[href]) continue;
+            var link = document.createElement('link');
+            link.rel = 'stylesheet';
+            link.href = href;
+            document.head.appendChild(link);
+        }
+    },
+
+    _loadScripts: function (doc, callback) {
+        var self = this;
+        var existing = document.querySelectorAll('script[src]');
+        for (var i = 0; i < existing.length; i++) this._loadedScripts[existing[i].getAttribute('src')] = true;
+
+        var pending = [];
+        var scripts = doc.querySelectorAll('script[src]');
+        for (var i = 0; i < scripts.length; i++) {
+            var src = scripts[i].getAttribute('src');
+            if (!this._loadedScripts[src]) pending.push(src);
+        }
+
+        (function next() {
+            if (!pending.length) return callback();
+            var src = pending.shift();
+            var el = document.createElement('script');
+            el.src = src;
+            el.onload = el.onerror = next;
+            self._loadedScripts[src] = true;
+            document.head.appendChild(el);
+        })();
+    },
+
+    /**
+     * Switch to another page. In single-page mode the view is swapped into the
+     * current document so the bridge, settings, translations and parsed
+     * stylesheets are reused; otherwise this is a regular navigation.
+     * @param {string} url - e.g. 'sessions.html' or 'index.html?startTour=true'
+     */
+    navigate: function (url) {
+        var self = this;
+        if (this.settings.singlePageMode === false || !window.py || !window.DOMParser) {
+            window.location.href = url;
+            return;
+        }
+
+        var started = performance.now();
+        var page = url.split('?')[0];
+        var name = page.replace(/\.html$/, '');
+
+        this._fetchPage(page, function (doc) {
+            if (!doc) {
+                window.location.href = url;
+                return;
+            }
+            self._unmountView();
+            self._spaActive = true;
+            self._syncStylesheets(doc);
+            document.title = doc.title;
+            document.body.innerHTML = doc.body.innerHTML;
+            window.history.replaceState(null, '', url);
+            window.scrollTo(0, 0);
+            self.setupWindowControls();
+
+            self._loadScripts(doc, function () {
+                var mount = self.views[name];
+                if (mount) mount();
+                if (window.startTourIfRequested) window.startTourIfRequested();
+                self.lastNavigationMs = performance.now() - started;
+                console.log('[Taskbar] Switched to ' + page + ' in ' + self.lastNavigationMs.toFixed(1) + ' ms');
+            });
+        });
+    },
+
     /**
      * Load settings from backend and apply common UI changes
      * @param {Function} callback - Called with settings object
      */
     loadAndApplySettings: function (callback) {
         var self = this;
+
+        // Views mounted by navigate() reuse the settings and translations already loaded
+        if (this._settingsLoaded && window.py) {
+            this.applyTranslations();
+            this.applyTheme(this.settings);
+            if (callback) callback(this.settings);
+            return;
+        }
+
         if (!window.py || !window.py.load_settings_from_file) {
             // Fallback for standalone mode: Try to load from localStorage or just use defaults
             var saved = localStorage.getItem('anki_taskbar_settings');
@@ -122,6 +301,7 @@ window.AnkiTaskbar = {
             try {
                 var settings = data ? JSON.parse(data) : {};
                 self.settings = settings;
+                self._settingsLoaded = true;
 
                 // Load translations first, then apply theme and UI
                 self.loadTranslations(settings.language || 'en', function () {
@@ -208,6 +388,7 @@ window.AnkiTaskbar = {
      */
     applyTheme: function (settings) {
         if (!settings) settings = {};
+        this.settings = settings;
         var theme = settings.theme || 'green';
         var appearance = settings.appearance || 'dark';
         var zoomLevel = settings.zoomLevel !== undefined ? settings.zoomLevel : 1.0;
@@ -252,5 +433,68 @@ window.AnkiTaskbar = {
                 reject(new Error("Method " + method + " not found on backend"));
             }
         });
+    },
+
+    /**
+     * Like callBackend, but for read-only slots the backend runs off the GUI
+     * thread; the result arrives later through the resultReady signal.
+     * Falls back to callBackend when the backend has no async support.
+     * @param {string} method
+     * @param {Array} args
+     * @returns {Promise}
+     */
+    callBackendAsync: function (method, args) {
+        var self = this;
+        if (!window.py || !window.py.request_async || !window.py.resultReady) {
+            return this.callBackend(method, args);
+        }
+        if (!this._asyncConnected) {
+            // Connected once for the page's lifetime, not per view
+            window.py.resultReady.connect(function (id, response) {
+                var pending = self._asyncPending[id];
+                if (!pending) {
+                    self._asyncEarly[id] = response;
+                    return;
+                }
+                delete self._asyncPending[id];
+                self._settleAsync(pending, response);
+            });
+            this._asyncConnected = true;
+        }
+        return new Promise(function (resolve, reject) {
+            window.py.request_async(method, JSON.stringify(args || []), function (id) {
+                var pending = { resolve: resolve, reject: reject, method: method };
+                if (id in self._asyncEarly) {
+                    var response = self._asyncEarly[id];
+                    delete self._asyncEarly[id];
+                    self._settleAsync(pending, response);
+                } else {
+                    self._asyncPending[id] = pending;
+                }
+            });
+        });
+    },
+
+    /**
+     * Run several backend calls in one round trip through the batch slot
+     * @param {Array} calls - [[method, args], ...]
+     * @returns {Promise} resolving to the results, in call order
+     */
+    callBackendBatch: function (calls) {
+        var self = this;
+        if (!window.py || !window.py.batch) {
+            return Promise.all(calls.map(function (c) { return self.callBackend(c[0], c[1]); }));
+        }
+        var payload = calls.map(function (c) { return { method: c[0], args: c[1] || [] }; });
+        return this.callBackend('batch', [JSON.stringify(payload)]);
+    },
+
+    _settleAsync: function (pending, response) {
+        try {
+            pending.resolve(response ? JSON.parse(response) : { ok: true });
+        } catch (e) {
+            console.error("Error parsing response from " + pending.method + ":", e);
+            pending.reject(e);
+        }
     }
 };
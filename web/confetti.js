@@ -133,7 +133,16 @@ function triggerConfetti(count = 100) {
     confettiSystem.trigger(count);
 }
 
+// Don't keep animating frames nobody can see
+function stopConfettiWhenHidden() {
+    if (document.visibilityState === 'hidden' && confettiSystem) {
+        confettiSystem.cleanup();
+        confettiSystem = null;
+    }
+}
+
 // Export for use
 if (typeof window !== 'undefined') {
     window.triggerConfetti = triggerConfetti;
+    document.addEventListener('visibilitychange', stopConfettiWhenHidden);
 }
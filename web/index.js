@@ -1,8 +1,26 @@
-document.addEventListener("DOMContentLoaded", function () {
+AnkiTaskbar.registerView('index', function () {
+    // Render the first state this view receives, even if its version was seen before
+    window.stateVersion = undefined;
+    window.tasksVersion = undefined;
+    window.taskData = undefined;
+
     // Initialize common utilities and bridge
     AnkiTaskbar.init(function (py) {
         if (!py) return;
 
+        // Incremental count updates pushed after each answered card
+        AnkiTaskbar.connectSignal(py.taskUpdated, applyTaskDeltas);
+        // Full state pushed by the backend whenever it changes
+        AnkiTaskbar.connectSignal(py.stateChanged, onStateChanged);
+
+        // One-time move of the priorities older versions kept in localStorage
+        var legacyMetadata = localStorage.getItem('deck_metadata');
+        if (legacyMetadata) {
+            AnkiTaskbar.callBackend('import_deck_metadata', [legacyMetadata]).then(function (res) {
+                if (res && res.ok) localStorage.removeItem('deck_metadata');
+            });
+        }
+
         // Load settings and apply initial UI state
         AnkiTaskbar.loadAndApplySettings(function (cfg) {
             // Initial Load of task data
@@ -11,7 +29,7 @@ document.addEventListener("DOMContentLoaded", function () {
     });
 
     // --- Statistics Rendering ---
-    function updateSelectedDecksStats(data, totals) {
+    function updateSelectedDecksStats(data, totals, deckTotals) {
         var statsBar = document.getElementById('selected-decks-stats');
         if (!statsBar) return;
 
@@ -27,8 +45,25 @@ document.addEventListener("DOMContentLoaded", function () {
             completedCards += (t.done || 0);
         }
 
+        // Today's reviews and time spent in the selected decks only
+        var selectedCards = 0;
+        var selectedReviews = 0;
+        var selectedTimeMs = 0;
+        if (deckTotals) {
+            for (var i = 0; i < data.length; i++) {
+                var dt = deckTotals[String(data[i].deckId)];
+                if (!dt) continue;
+                selectedCards += dt.total_cards || 0;
+                selectedReviews += dt.total_reviews || 0;
+                selectedTimeMs += dt.total_time_ms || 0;
+            }
+        }
+
+        // Prefer the pace in the selected decks, then the whole collection's pace today
         var secondsPerCard = 60;
-        if (totals && totals.total_cards > 5 && totals.total_time_ms > 0) {
+        if (selectedCards > 5 && selectedTimeMs > 0) {
+            secondsPerCard = Math.min(Math.max((selectedTimeMs / 1000) / selectedCards, 5), 180);
+        } else if (totals && totals.total_cards > 5 && totals.total_time_ms > 0) {
             secondsPerCard = (totals.total_time_ms / 1000) / totals.total_cards;
             secondsPerCard = Math.min(Math.max(secondsPerCard, 5), 180);
         }
@@ -58,6 +93,7 @@ document.addEventListener("DOMContentLoaded", function () {
         if (deckCountEl) deckCountEl.textContent = String(totalDecks);
         if (cardsFormatEl) cardsFormatEl.textContent = String(totalCards);
         if (timeEl) {
+            timeEl.title = deckTotals ? selectedReviews + ' ' + AnkiTaskbar.t('reviews') + ' \u00b7 ' + Math.round(selectedTimeMs / 60000) + 'm' : '';
             if (finishTimeStr) {
                 timeEl.innerHTML = '<span>' + estimatedTime + '</span><span class="finish-time">' + finishTimeStr + '</span>';
             } else {
@@ -79,240 +115,480 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     }
 
+    // Tomorrow's load under the card count; re-read only when the task list is re-rendered
+    function refreshForecast(data) {
+        var el = document.getElementById('stats-due-tomorrow');
+        if (!el) return;
+        var ids = [];
+        for (var i = 0; i < data.length; i++) ids.push(String(data[i].deckId));
+        if (!ids.length) { el.textContent = ''; return; }
+        AnkiTaskbar.callBackendAsync('get_due_forecast', [JSON.stringify(ids), 2]).then(function (forecast) {
+            var tomorrow = forecast && forecast.total && forecast.total[1];
+            el.textContent = tomorrow ? AnkiTaskbar.t('due_tomorrow') + ': ' + tomorrow : '';
+        });
+    }
+
     // --- Data Refresh Logic ---
+    // A slow get_state reply may arrive after a newer push; versions only grow
+    function isStale(state) {
+        return !state || (window.stateVersion !== undefined && state.version <= window.stateVersion);
+    }
+
+    // Pulls the current state once; later changes arrive through stateChanged
     window.refreshData = function () {
         if (!window.py) return;
+        AnkiTaskbar.callBackend('get_state', []).then(function (state) {
+            if (isStale(state)) return;
+            window.tasksVersion = state.tasks_version;
+            renderState(state, null);
+        });
+    };
 
-        var mainContainer = document.getElementById('main-content-container');
-        var container = document.getElementById('task-list-container');
-        var savedScrollTop = mainContainer ? mainContainer.scrollTop : 0;
-
-        AnkiTaskbar.callBackend('get_taskbar_tasks', []).then(function (data) {
-            var tasksById = {};
-            for (var i = 0; i < data.length; i++) {
-                tasksById[Number(data[i].deckId)] = data[i];
-            }
-
-            var metadata = JSON.parse(localStorage.getItem('deck_metadata') || '{}');
-            var getPriority = function (id) { return (metadata[id] && metadata[id].priority) || 'medium'; };
-
-            var priorityOrder = { high: 0, medium: 1, low: 2 };
-            data.sort(function (a, b) {
-                if (a.completed !== b.completed) return a.completed ? 1 : -1;
-                return priorityOrder[getPriority(a.deckId)] - priorityOrder[getPriority(b.deckId)];
+    function onStateChanged(payload) {
+        var state;
+        try { state = JSON.parse(payload); }
+        catch (e) { console.error("Failed to parse pushed state:", e); return; }
+        if (isStale(state)) return;
+        // Pushes carry only the tasks changed since the previous push; catch up if we missed one
+        if (window.taskData && window.tasksVersion === state.tasks_from) {
+            renderState(state, mergeTasksDelta(state.tasks_delta));
+        } else {
+            AnkiTaskbar.callBackend('get_taskbar_tasks_delta', [window.tasksVersion || '']).then(function (delta) {
+                renderState(state, mergeTasksDelta(delta));
             });
+        }
+    }
 
-            var activeDecks = [];
-            var completedDecks = [];
-            for (var i = 0; i < data.length; i++) {
-                if (data[i].completed) completedDecks.push(data[i]);
-                else activeDecks.push(data[i]);
-            }
-
-            window.taskData = data;
+    // Folds a {version, unchanged | full+items | changed+removed[+order]} delta into
+    // window.taskData. Returns the changed tasks if they can be patched in place, or
+    // null if rows were added, removed, reordered, renamed or moved to the completed list.
+    function mergeTasksDelta(delta) {
+        if (!delta) return [];
+        window.tasksVersion = delta.version;
+        if (delta.unchanged) return [];
+        if (delta.full || !window.taskData) {
+            window.taskData = delta.items || [];
+            return null;
+        }
+        var byId = {};
+        for (var i = 0; i < window.taskData.length; i++) byId[String(window.taskData[i].deckId)] = window.taskData[i];
+        var inPlace = !delta.order && delta.removed.length === 0;
+        for (var i = 0; i < delta.changed.length; i++) {
+            var t = delta.changed[i];
+            var old = byId[String(t.deckId)];
+            if (!old || old.completed !== t.completed || old.name !== t.name) inPlace = false;
+            byId[String(t.deckId)] = t;
+        }
+        var data = [];
+        if (delta.order) {
+            for (var i = 0; i < delta.order.length; i++) data.push(byId[delta.order[i]]);
+        } else {
+            for (var i = 0; i < window.taskData.length; i++) data.push(byId[String(window.taskData[i].deckId)]);
+        }
+        window.taskData = data;
+        return inPlace ? delta.changed : null;
+    }
 
-            AnkiTaskbar.callBackend('get_today_review_totals', []).then(function (totals) {
-                updateSelectedDecksStats(data, totals);
-            });
+    // --- Task List Rendering ---
+    // Active decks are shown as a tree flattened into rows, keyed by deck id (or
+    // by name for parent decks that aren't tasks themselves). Row elements are
+    // reused across renders and only their changed text, classes and widths are
+    // written, once per animation frame. Past VIRTUAL_MIN_ROWS only the rows in
+    // the viewport are in the DOM.
+    var VIRTUAL_MIN_ROWS = 150;
+    var OVERSCAN = 10;
+    var rowHeight = 48;
+    var roots = [];
+    var nodes = {};           // key -> { key, name, fullName, task, children }
+    var rows = [];            // [{ node, depth }] in display order
+    var taskRows = [];        // indices into rows of rows with a task
+    var rowEls = {};          // key -> row element in the DOM
+    var collapsed = {};       // key -> true
+    var completed = [];
+    var completedEls = {};    // deck id -> completed list item
+    var completedDirty = false;
+    var searchTerm = '';
+    var cursor = 0;           // index into taskRows, for keyboard navigation
+    var renderQueued = false;
+    var remeasure = false;
+
+    var scroller = document.getElementById('main-content-container');
+    var listContainer = document.getElementById('task-list-container');
+    var completedContainer = document.getElementById('completed-list-container');
+    var completedSection = document.getElementById('completed-section');
+    var placeholder = document.createElement('p');
+    placeholder.className = 'placeholder';
+    var spacer = document.createElement('div');
+    spacer.className = 'deck-tree-spacer task-tree';
+    var completedList = document.createElement('ul');
+    completedList.className = 'task-list completed-list';
+    if (listContainer) {
+        listContainer.innerHTML = '';
+        listContainer.appendChild(placeholder);
+        listContainer.appendChild(spacer);
+    }
+    if (completedContainer) {
+        completedContainer.innerHTML = '';
+        completedContainer.appendChild(completedList);
+    }
 
-            var completedContainer = document.getElementById('completed-list-container');
-            var completedSection = document.getElementById('completed-section');
-            container.innerHTML = "";
-            if (completedContainer) completedContainer.innerHTML = "";
+    // `changed` lists tasks whose counts moved in place; null rebuilds the rows
+    function renderState(state, changed) {
+        if (isStale(state)) return;
+        window.stateVersion = state.version;
+        if (state.tasks) window.taskData = state.tasks;
+        window.lastTotals = state.totals;
+        window.lastDeckTotals = state.deck_totals;
+
+        if (!window._firstRenderReported && window.py.report_first_render) {
+            window._firstRenderReported = true;
+            window.py.report_first_render();
+        }
 
-            _applyVisibilities();
-            if (!data || data.length === 0) {
-                container.innerHTML = '<p class="placeholder">' + AnkiTaskbar.t('no_decks_selected') + '</p>';
-                if (completedSection) completedSection.style.display = 'none';
-                return;
-            }
+        if (changed) {
+            for (var i = 0; i < changed.length; i++) patchTaskRow(changed[i]);
+            updateProgressTotals(window.taskData);
+            return;
+        }
 
-            var totalDue = 0;
-            var totalDone = 0;
-            for (var i = 0; i < data.length; i++) {
-                totalDue += (data[i].dueStart || 0);
-                totalDone += (data[i].done || 0);
-            }
-            window.totalDoneToday = totalDone;
+        // Already sorted by the backend: unfinished first, then by priority
+        var data = window.taskData || [];
+        updateProgressTotals(data);
+        refreshForecast(data);
+        _applyVisibilities();
 
-            var globalPct = totalDue > 0 ? (totalDone / totalDue) * 100 : 0;
-            var globalBar = document.getElementById('global-progress-value');
-            if (globalBar) globalBar.style.width = Math.min(Math.max(globalPct, 0), 100) + '%';
+        buildTree(data);
+        completed = [];
+        for (var i = 0; i < data.length; i++) {
+            if (data[i].completed) completed.push(data[i]);
+        }
+        completedDirty = true;
+
+        var hasActive = roots.length > 0;
+        placeholder.textContent = !data.length ? AnkiTaskbar.t('no_decks_selected') :
+            !hasActive ? AnkiTaskbar.t('all_decks_completed') : '';
+        placeholder.style.display = hasActive ? 'none' : '';
+        if (data.length && !hasActive && window.triggerConfetti && AnkiTaskbar.settings.confetti !== false) {
+            window.triggerConfetti(100);
+        }
+        flattenRows();
+    }
 
-            // Render Decks
-            if (activeDecks.length === 0) {
-                container.innerHTML = '<p class="placeholder">' + AnkiTaskbar.t('all_decks_completed') + '</p>';
-                if (window.triggerConfetti && AnkiTaskbar.settings.confetti !== false) {
-                    window.triggerConfetti(100);
+    // Active decks plus the parents needed to place them, by full name
+    function buildTree(data) {
+        var byName = {};
+        for (var i = 0; i < data.length; i++) byName[data[i].name] = data[i];
+        roots = [];
+        nodes = {};
+        var byFullName = {};
+        for (var i = 0; i < data.length; i++) {
+            if (data[i].completed) continue;
+            var parts = data[i].name.split('::');
+            var parent = null;
+            for (var d = 0; d < parts.length; d++) {
+                var fullName = parts.slice(0, d + 1).join('::');
+                var node = byFullName[fullName];
+                if (!node) {
+                    var task = byName[fullName] || null;
+                    node = byFullName[fullName] = {
+                        key: task ? String(task.deckId) : 'name:' + fullName,
+                        name: parts[d], fullName: fullName, task: task, children: []
+                    };
+                    nodes[node.key] = node;
+                    (parent ? parent.children : roots).push(node);
                 }
-            } else {
-                AnkiTaskbar.callBackend('get_deck_tree', []).then(function (tree) {
-                    var selectedDecksSet = {};
-                    for (var i = 0; i < activeDecks.length; i++) {
-                        selectedDecksSet[Number(activeDecks[i].deckId)] = true;
-                    }
-                    var taskElements = renderTree(tree, container, selectedDecksSet, tasksById, getPriority);
-                    setupKeyboardNav(taskElements);
-                    if (mainContainer) mainContainer.scrollTop = savedScrollTop;
-                });
+                parent = node;
             }
+        }
+        sortNodes(roots);
+    }
 
-            renderCompleted(completedDecks, completedContainer, completedSection, getPriority);
+    function sortNodes(list) {
+        list.sort(function (a, b) {
+            var x = a.name.toLowerCase(), y = b.name.toLowerCase();
+            return x < y ? -1 : x > y ? 1 : 0;
         });
-    };
-
-    function renderTree(tree, container, selectedSet, tasksById, getPriority) {
-        var taskElements = [];
-        var ul = document.createElement('ul');
-        ul.className = 'task-tree';
+        for (var i = 0; i < list.length; i++) sortNodes(list[i].children);
+    }
 
-        function buildPrunedTree(node) {
-            var id = Number(node.id);
-            var children = [];
-            if (node.children) {
+    // Rows for the visible part of the tree; searching shows matches and their parents
+    function flattenRows() {
+        var cursorRow = rows[taskRows[cursor]];
+        var cursorKey = cursorRow ? cursorRow.node.key : null;
+        rows = [];
+        taskRows = [];
+        function visit(node, depth) {
+            var start = rows.length;
+            rows.push({ node: node, depth: depth });
+            var shown = !searchTerm || node.name.toLowerCase().indexOf(searchTerm) !== -1;
+            if (searchTerm || !collapsed[node.key]) {
                 for (var i = 0; i < node.children.length; i++) {
-                    var child = buildPrunedTree(node.children[i]);
-                    if (child) children.push(child);
+                    if (visit(node.children[i], depth + 1)) shown = true;
                 }
             }
-            if (selectedSet[id] || children.length > 0) {
-                var newNode = JSON.parse(JSON.stringify(node));
-                newNode.children = children;
-                return newNode;
-            }
-            return null;
+            if (!shown) rows.length = start;
+            return shown;
         }
+        for (var i = 0; i < roots.length; i++) visit(roots[i], 0);
+        cursor = 0;
+        for (var i = 0; i < rows.length; i++) {
+            if (!rows[i].node.task) continue;
+            if (rows[i].node.key === cursorKey) cursor = taskRows.length;
+            taskRows.push(i);
+        }
+        completedDirty = true;
+        scheduleRender();
+    }
 
-        function renderNode(node, parentUl) {
-            var li = document.createElement('li');
-            var row = document.createElement('div');
-            row.className = 'deck-item task-node';
-
-            var task = tasksById[Number(node.id)];
-            if (task) row.className += ' priority-' + getPriority(task.deckId);
-
-            if (node.children && node.children.length > 0) {
-                li.className += ' has-children expanded';
-                var toggle = document.createElement('span');
-                toggle.className = 'toggle';
-                toggle.onclick = function (e) {
-                    e.stopPropagation();
-                    if (li.classList.contains('expanded')) li.classList.remove('expanded');
-                    else li.classList.add('expanded');
-                };
-                row.appendChild(toggle);
+    function patchTaskRow(task) {
+        var node = nodes[String(task.deckId)];
+        if (node) node.task = task;
+        for (var i = 0; i < completed.length; i++) {
+            if (String(completed[i].deckId) === String(task.deckId)) {
+                completed[i] = task;
+                completedDirty = true;
             }
+        }
+        scheduleRender();
+    }
 
-            if (task) {
-                var prog = document.createElement('div');
-                prog.className = 'task-progress-bar';
-                prog.style.width = Math.min(Math.max(task.progress * 100, 0), 100) + '%';
-                row.appendChild(prog);
-
-                var content = document.createElement('div');
-                content.className = 'task-content';
-                var nameParts = node.name.split('::');
-                var shortName = nameParts[nameParts.length - 1];
-                content.innerHTML = '<span class="task-name">' + shortName + '</span><span class="counts">' + task.dueNow + '</span>';
-                row.appendChild(content);
-
-                row.onclick = function () { if (window.py) window.py.start_review(String(task.deckId)); };
-
-                (function () {
-                    var currentIndex = taskElements.length;
-                    row.onmouseenter = function () { updateSelection(currentIndex); };
-                    taskElements.push(row);
-                })();
-            } else {
-                var content = document.createElement('div');
-                content.className = 'task-content';
-                var nameParts = node.name.split('::');
-                content.innerHTML = '<span class="task-name">' + nameParts[nameParts.length - 1] + '</span>';
-                row.appendChild(content);
-            }
+    function scheduleRender() {
+        if (renderQueued) return;
+        renderQueued = true;
+        requestAnimationFrame(function () {
+            renderQueued = false;
+            renderWindow();
+            if (completedDirty) renderCompleted();
+        });
+    }
 
-            li.appendChild(row);
-            if (node.children && node.children.length > 0) {
-                var nested = document.createElement('ul');
-                nested.className = 'nested-list';
-                for (var i = 0; i < node.children.length; i++) {
-                    renderNode(node.children[i], nested);
-                }
-                li.appendChild(nested);
+    function renderWindow() {
+        var first = 0;
+        var last = rows.length;
+        if (rows.length > VIRTUAL_MIN_ROWS && scroller) {
+            var top = spacer.getBoundingClientRect().top - scroller.getBoundingClientRect().top;
+            first = Math.max(0, Math.floor(-top / rowHeight) - OVERSCAN);
+            last = Math.min(rows.length, Math.ceil((scroller.clientHeight - top) / rowHeight) + OVERSCAN);
+        }
+        setStyle(spacer, 'height', (rows.length * rowHeight) + 'px');
+        var shown = {};
+        var created = false;
+        for (var i = first; i < last; i++) {
+            var key = rows[i].node.key;
+            var el = rowEls[key];
+            if (!el) {
+                el = rowEls[key] = createRow(rows[i].node);
+                spacer.appendChild(el);
+                created = true;
             }
-            parentUl.appendChild(li);
+            updateRow(el, rows[i], i);
+            shown[key] = true;
+        }
+        for (var key in rowEls) {
+            if (shown[key]) continue;
+            spacer.removeChild(rowEls[key]);
+            delete rowEls[key];
         }
+        if (created || remeasure) measureRowHeight();
+        remeasure = false;
+    }
 
-        var pruned = buildPrunedTree(tree);
-        if (pruned && pruned.children) {
-            for (var i = 0; i < pruned.children.length; i++) {
-                renderNode(pruned.children[i], ul);
-            }
+    function measureRowHeight() {
+        var item = spacer.querySelector('.deck-row .deck-item');
+        if (!item) return;
+        var height = item.offsetHeight + parseFloat(getComputedStyle(item).marginBottom || 0);
+        if (height > 0 && Math.abs(height - rowHeight) > 0.5) {
+            rowHeight = height;
+            scheduleRender();
         }
-        container.appendChild(ul);
+    }
+
+    function createRow(node) {
+        var el = document.createElement('div');
+        el.className = 'deck-row';
+        el.setAttribute('data-key', node.key);
+        el.innerHTML = '<div class="deck-item task-node"><span class="toggle"></span>' +
+            '<div class="task-progress-bar"></div>' +
+            '<div class="task-content"><span class="task-name"></span><span class="counts"></span></div></div>';
+        el._item = el.firstChild;
+        el._toggle = el._item.children[0];
+        el._progress = el._item.children[1];
+        el._name = el._item.querySelector('.task-name');
+        el._counts = el._item.querySelector('.counts');
+        if (node.task) el._item.setAttribute('data-deck-id', node.task.deckId);
+        return el;
+    }
+
+    function setStyle(el, prop, value) {
+        if (el.style[prop] !== value) el.style[prop] = value;
+    }
+
+    function setText(el, text) {
+        if (el.textContent !== text) el.textContent = text;
+    }
+
+    function setClass(el, name) {
+        if (el.className !== name) el.className = name;
+    }
+
+    function updateRow(el, row, index) {
+        var node = row.node;
+        var task = node.task;
+        var hasChildren = node.children.length > 0;
+        el._index = index;
+        setStyle(el, 'top', (index * rowHeight) + 'px');
+        setStyle(el, 'paddingLeft', (row.depth * 24) + 'px');
+        setClass(el, 'deck-row' + (hasChildren ? ' has-children' + (collapsed[node.key] && !searchTerm ? '' : ' expanded') : ''));
+        setClass(el._item, 'deck-item task-node' + (task ? ' priority-' + (task.priority || 'medium') : '') +
+            (task && taskRows[cursor] === index ? ' selected' : ''));
+        setStyle(el._toggle, 'display', hasChildren ? '' : 'none');
+        setStyle(el._progress, 'display', task ? '' : 'none');
+        setStyle(el._counts, 'display', task ? '' : 'none');
+        setText(el._name, node.name);
+        if (!task) return;
+        setText(el._counts, String(task.dueNow));
+        setStyle(el._progress, 'width', Math.min(Math.max(task.progress * 100, 0), 100) + '%');
+    }
 
-        function updateSelection(idx) {
-            for (var i = 0; i < taskElements.length; i++) {
-                if (i === idx) taskElements[i].classList.add('selected');
-                else taskElements[i].classList.remove('selected');
+    function renderCompleted() {
+        completedDirty = false;
+        if (!completedContainer || !completedSection) return;
+        var hide = !completed.length || AnkiTaskbar.settings.hideCompleted;
+        setStyle(completedSection, 'display', hide ? 'none' : 'block');
+        var shown = {};
+        var next = completedList.firstChild;
+        for (var i = 0; i < completed.length; i++) {
+            var t = completed[i];
+            var id = String(t.deckId);
+            var li = completedEls[id];
+            if (!li) {
+                li = completedEls[id] = document.createElement('li');
+                li.setAttribute('data-deck-id', id);
+                li.innerHTML = '<div class="task-progress-bar" style="width:100%"></div>' +
+                    '<div class="task-content"><span class="task-name"></span><span class="counts status-completed">' +
+                    AnkiTaskbar.t('completed') + '</span></div>';
             }
-            window.currentSelectedIndex = idx;
+            setClass(li, 'task-item completed priority-' + (t.priority || 'medium'));
+            setText(li.querySelector('.task-name'), t.name);
+            setStyle(li, 'display', !searchTerm || t.name.toLowerCase().indexOf(searchTerm) !== -1 ? '' : 'none');
+            // Keyed reorder: move only the items that are out of place
+            if (li !== next) completedList.insertBefore(li, next);
+            else next = next.nextSibling;
+            shown[id] = true;
+        }
+        for (var id in completedEls) {
+            if (shown[id]) continue;
+            completedList.removeChild(completedEls[id]);
+            delete completedEls[id];
         }
-        if (taskElements.length > 0) updateSelection(0);
-        return taskElements;
     }
 
-    function setupKeyboardNav(taskElements) {
-        if (window._taskListKeyHandler) document.removeEventListener('keydown', window._taskListKeyHandler);
-        window._taskListKeyHandler = function (e) {
-            var isInput = ['INPUT', 'TEXTAREA'].indexOf(e.target.tagName) !== -1 || e.target.isContentEditable;
-            if (isInput) return;
-            if (!taskElements.length) return;
-            var idx = window.currentSelectedIndex || 0;
-            if (e.key === 'ArrowDown') idx = (idx + 1) % taskElements.length;
-            else if (e.key === 'ArrowUp') idx = (idx - 1 + taskElements.length) % taskElements.length;
-            else if (e.key === 'Enter') {
-                if (taskElements[idx]) taskElements[idx].click();
-                return;
-            }
-            else return;
+    // --- Row Interaction ---
+    function rowAt(target) {
+        var el = target.closest ? target.closest('.deck-row') : null;
+        return el && rows[el._index] && rows[el._index].node.key === el.getAttribute('data-key') ? el : null;
+    }
 
-            e.preventDefault();
-            for (var i = 0; i < taskElements.length; i++) {
-                if (i === idx) taskElements[i].classList.add('selected');
-                else taskElements[i].classList.remove('selected');
+    if (listContainer) {
+        listContainer.onclick = function (e) {
+            var el = rowAt(e.target);
+            if (!el) return;
+            var node = rows[el._index].node;
+            if (e.target.classList.contains('toggle')) {
+                e.stopPropagation();
+                if (searchTerm) return;
+                if (collapsed[node.key]) delete collapsed[node.key];
+                else collapsed[node.key] = true;
+                flattenRows();
+            } else if (node.task && window.py) {
+                window.py.start_review(String(node.task.deckId));
             }
-            window.currentSelectedIndex = idx;
-            if (taskElements[idx]) {
-                if (typeof taskElements[idx].scrollIntoView === 'function') {
-                    taskElements[idx].scrollIntoView({ behavior: 'smooth', block: 'nearest' });
-                }
+        };
+        listContainer.onmouseover = function (e) {
+            var el = rowAt(e.target);
+            if (!el || !rows[el._index].node.task) return;
+            var idx = taskRows.indexOf(el._index);
+            if (idx !== -1 && idx !== cursor) {
+                cursor = idx;
+                scheduleRender();
             }
         };
-        document.addEventListener('keydown', window._taskListKeyHandler);
+    }
+    if (completedList) {
+        completedList.onclick = function (e) {
+            var li = e.target.closest ? e.target.closest('li') : null;
+            if (li && window.py) window.py.start_review(li.getAttribute('data-deck-id'));
+        };
+    }
+    if (scroller) AnkiTaskbar.listen(scroller, 'scroll', function () {
+        if (rows.length > VIRTUAL_MIN_ROWS) scheduleRender();
+    });
+    AnkiTaskbar.listen(window, 'resize', function () {
+        remeasure = true;
+        scheduleRender();
+    });
+
+    // Keeps the cursor row inside the scroll area
+    function scrollToRow(index) {
+        if (!scroller) return;
+        var top = spacer.getBoundingClientRect().top - scroller.getBoundingClientRect().top + scroller.scrollTop;
+        var y = top + index * rowHeight;
+        if (y < scroller.scrollTop) scroller.scrollTop = y;
+        else if (y + rowHeight > scroller.scrollTop + scroller.clientHeight) scroller.scrollTop = y + rowHeight - scroller.clientHeight;
     }
 
-    function renderCompleted(decks, container, section, getPriority) {
-        if (!decks.length || !container || !section) {
-            if (section) section.style.display = 'none';
+    AnkiTaskbar.listen(document, 'keydown', function (e) {
+        var isInput = ['INPUT', 'TEXTAREA'].indexOf(e.target.tagName) !== -1 || e.target.isContentEditable;
+        if (isInput || !taskRows.length) return;
+        if (e.key === 'ArrowDown') cursor = (cursor + 1) % taskRows.length;
+        else if (e.key === 'ArrowUp') cursor = (cursor - 1 + taskRows.length) % taskRows.length;
+        else if (e.key === 'Enter') {
+            var task = rows[taskRows[cursor]].node.task;
+            if (task && window.py) window.py.start_review(String(task.deckId));
             return;
         }
-        section.style.display = 'block';
-        var ul = document.createElement('ul');
-        ul.className = 'task-list completed-list';
-        for (var i = 0; i < decks.length; i++) {
-            (function () {
-                var t = decks[i];
-                var li = document.createElement('li');
-                li.className = 'task-item completed';
-                li.className += ' priority-' + getPriority(t.deckId);
-                li.innerHTML = '<div class="task-progress-bar" style="width:100%"></div>' +
-                    '<div class="task-content"><span class="task-name">' + t.name + '</span><span class="counts status-completed">' + AnkiTaskbar.t('completed') + '</span></div>';
-                li.onclick = function () { if (window.py) window.py.start_review(String(t.deckId)); };
-                ul.appendChild(li);
-            })();
+        else return;
+
+        e.preventDefault();
+        scrollToRow(taskRows[cursor]);
+        scheduleRender();
+    });
+
+    // --- Incremental Updates ---
+    function applyTaskDeltas(json) {
+        var deltas = [];
+        try { deltas = JSON.parse(json) || []; } catch (e) { return; }
+        var data = window.taskData || [];
+        for (var i = 0; i < deltas.length; i++) {
+            var d = deltas[i];
+            var task = null;
+            for (var j = 0; j < data.length; j++) {
+                if (Number(data[j].deckId) === Number(d.deckId)) { task = data[j]; break; }
+            }
+            // A deck moving between the active and completed lists needs a full render
+            if (!task || task.completed !== d.completed) {
+                window.refreshData();
+                return;
+            }
+            task.dueNow = d.dueNow;
+            task.done = d.done;
+            task.progress = d.progress;
+            patchTaskRow(task);
         }
-        container.appendChild(ul);
+        updateProgressTotals(data);
+    }
+
+    function updateProgressTotals(data) {
+        var totalDue = 0;
+        var totalDone = 0;
+        for (var i = 0; i < data.length; i++) {
+            totalDue += (data[i].dueStart || 0);
+            totalDone += (data[i].done || 0);
+        }
+        window.totalDoneToday = totalDone;
+        var globalBar = document.getElementById('global-progress-value');
+        if (globalBar) globalBar.style.width = Math.min(Math.max(totalDue > 0 ? (totalDone / totalDue) * 100 : 0, 0), 100) + '%';
+        updateSelectedDecksStats(data, window.lastTotals, window.lastDeckTotals);
     }
 
     function _applyVisibilities() {
@@ -342,24 +618,10 @@ document.addEventListener("DOMContentLoaded", function () {
     var searchInput = document.getElementById('search-input');
     if (searchInput) {
         searchInput.oninput = function (e) {
-            var term = e.target.value.toLowerCase();
-            var items = document.querySelectorAll('.task-tree li, .completed-list li');
-            for (var i = 0; i < items.length; i++) {
-                var li = items[i];
-                var nameEl = li.querySelector('.task-name');
-                var name = nameEl ? nameEl.textContent.toLowerCase() : '';
-                var visible = !term || name.indexOf(term) !== -1;
-                li.style.display = visible ? '' : 'none';
-                if (visible && term) {
-                    var parentNode = li.parentNode;
-                    while (parentNode && parentNode.tagName !== 'LI') parentNode = parentNode.parentNode;
-                    if (parentNode && parentNode.classList.contains('has-children')) {
-                        parentNode.classList.add('expanded');
-                    }
-                }
-            }
+            searchTerm = e.target.value.toLowerCase();
+            flattenRows();
         };
-        document.addEventListener('keydown', function (e) {
+        AnkiTaskbar.listen(document, 'keydown', function (e) {
             if (e.key === '/' && document.activeElement !== searchInput) {
                 e.preventDefault();
                 searchInput.focus();
@@ -1,4 +1,4 @@
-document.addEventListener("DOMContentLoaded", function () {
+AnkiTaskbar.registerView('select-deck', function () {
     // Initialize common utilities and bridge
     AnkiTaskbar.init(function (py) {
         if (!py) return;
@@ -29,189 +29,300 @@ document.addEventListener("DOMContentLoaded", function () {
         }, 2000);
     }
 
-    // --- Data Fetching & Rendering ---
+    // --- Tree State ---
+    // Children are fetched a page at a time as branches are expanded; only
+    // the rows inside the viewport are in the DOM.
+    var PAGE_SIZE = 200;
+    var OVERSCAN = 10;
+    var rowHeight = 48;
+    var decks = {};          // deck id -> row info from the backend
+    var kids = {};           // parent id -> { ids: [...], total: n }
+    var paths = {};          // deck id -> ancestor ids, top-down
+    var expanded = {};       // deck id -> true
+    var selected = {};       // deck id -> true
+    var selectedCount = 0;
+    var partial = {};        // deck id -> number of selected descendants
+    var rows = [];
+    var searchResults = null;
+    var searchSeq = 0;
+    var expandGeneration = 0;
+    var renderQueued = false;
+    var spacer = null;
+    var emptyState = document.getElementById('empty-state');
+
+    if (container) {
+        container.innerHTML = '';
+        spacer = document.createElement('div');
+        spacer.className = 'deck-tree-spacer';
+        container.appendChild(spacer);
+    }
+
     function fetchDeckTree() {
-        AnkiTaskbar.callBackend('get_deck_tree').then(function (tree) {
-            renderDeckTree(tree);
-            loadSelection();
+        // Top-level decks and the saved selection in one round trip
+        AnkiTaskbar.callBackendBatch([
+            ['get_deck_children', ['0', 0, PAGE_SIZE]],
+            isEditing ? ['get_sessions', []] : ['get_selected_decks', []]
+        ]).then(function (results) {
+            addPage(0, results[0]);
+            if (isEditing) applySession(results[1]);
+            else restoreSelection(results[1].selected_decks || []);
+        });
+    }
+
+    function loadChildren(parentId, offset) {
+        return AnkiTaskbar.callBackendAsync('get_deck_children', [String(parentId), offset, PAGE_SIZE]).then(function (page) {
+            addPage(parentId, page);
         });
     }
 
-    function renderDeckTree(tree) {
-        if (!container || !tree) return;
+    function addPage(parentId, page) {
+        var list = kids[parentId] || (kids[parentId] = { ids: [], total: 0 });
+        var items = page.items || [];
+        var path = parentId ? (paths[parentId] || []).concat([parentId]) : [];
+        list.total = page.total || 0;
+        for (var i = 0; i < items.length; i++) {
+            decks[items[i].id] = items[i];
+            paths[items[i].id] = path;
+            list.ids.push(items[i].id);
+        }
+        rebuildRows();
+    }
+
+    function rebuildRows() {
+        rows = [];
+        if (searchResults) {
+            for (var i = 0; i < searchResults.length; i++) rows.push({ id: searchResults[i], depth: 0 });
+        } else {
+            addRows(0, 0);
+        }
+        if (emptyState) emptyState.style.display = (searchResults && !searchResults.length) ? 'block' : 'none';
+        scheduleRender();
+    }
+
+    function addRows(parentId, depth) {
+        var list = kids[parentId];
+        if (!list) return;
+        for (var i = 0; i < list.ids.length; i++) {
+            var id = list.ids[i];
+            rows.push({ id: id, depth: depth });
+            if (!expanded[id]) continue;
+            if (kids[id]) addRows(id, depth + 1);
+            else rows.push({ loading: true, depth: depth + 1 });
+        }
+        if (list.ids.length < list.total) {
+            rows.push({ more: parentId, depth: depth, remaining: list.total - list.ids.length });
+        }
+    }
+
+    function scheduleRender() {
+        if (renderQueued) return;
+        renderQueued = true;
+        requestAnimationFrame(function () {
+            renderQueued = false;
+            renderWindow();
+        });
+    }
+
+    function renderWindow() {
+        if (!spacer) return;
+        spacer.style.height = (rows.length * rowHeight) + 'px';
+        var top = spacer.getBoundingClientRect().top;
+        var first = Math.max(0, Math.floor(-top / rowHeight) - OVERSCAN);
+        var last = Math.min(rows.length, Math.ceil((window.innerHeight - top) / rowHeight) + OVERSCAN);
         var fragment = document.createDocumentFragment();
-        var ul = document.createElement('ul');
-        var children = tree.children || [];
-        for (var i = 0; i < children.length; i++) {
-            buildNode(children[i], ul);
+        for (var i = first; i < last; i++) fragment.appendChild(buildRow(rows[i], i));
+        spacer.innerHTML = '';
+        spacer.appendChild(fragment);
+        measureRowHeight();
+    }
+
+    function measureRowHeight() {
+        var item = spacer.querySelector('.deck-row .deck-item');
+        if (!item) return;
+        var style = getComputedStyle(item);
+        var height = item.offsetHeight + parseFloat(style.marginBottom || 0);
+        if (height > 0 && Math.abs(height - rowHeight) > 0.5) {
+            rowHeight = height;
+            scheduleRender();
         }
-        fragment.appendChild(ul);
-        container.innerHTML = '';
-        container.appendChild(fragment);
     }
 
-    function buildNode(node, parentUl) {
-        var li = document.createElement('li');
+    function buildRow(row, index) {
+        var el = document.createElement('div');
+        el.className = 'deck-row';
+        el.style.top = (index * rowHeight) + 'px';
+        el.style.paddingLeft = (row.depth * 24) + 'px';
         var item = document.createElement('div');
         item.className = 'deck-item';
+        el.appendChild(item);
+
+        if (row.loading || row.more !== undefined) {
+            item.classList.add('deck-more');
+            item.textContent = row.loading ? AnkiTaskbar.t('loading_decks') :
+                AnkiTaskbar.t('show_more_decks').replace('%n', Math.min(row.remaining, PAGE_SIZE));
+            if (!row.loading) el.setAttribute('data-more', row.more);
+            return el;
+        }
+
+        var deck = decks[row.id];
+        el.setAttribute('data-deck-id', deck.id);
+        if (deck.children > 0 && !searchResults) {
+            el.classList.add('has-children');
+            if (expanded[deck.id]) el.classList.add('expanded');
+            var toggle = document.createElement('span');
+            toggle.className = 'toggle';
+            item.appendChild(toggle);
+        }
 
         var checkbox = document.createElement('input');
         checkbox.type = 'checkbox';
         checkbox.className = 'deck-checkbox';
-        checkbox.value = node.id;
-        checkbox.id = 'deck-' + node.id;
-
-        checkbox.onchange = function () {
-            updateChildren(li, checkbox.checked);
-            updateAncestors(li);
-            updateSelectionCounter();
-        };
+        checkbox.value = deck.id;
+        checkbox.id = 'deck-' + deck.id;
+        checkbox.checked = !!selected[deck.id];
+        checkbox.indeterminate = !selected[deck.id] && partial[deck.id] > 0;
+        item.appendChild(checkbox);
 
         var label = document.createElement('label');
         label.setAttribute('for', checkbox.id);
         label.className = 'deck-label';
-        var namePart = node.name.split('::').pop();
-        var count = (node.review || 0) + (node.learn || 0) + (node.new || 0);
-        label.innerHTML = '<span class="deck-name">' + namePart + '</span>' +
-            '<span class="counts">' + count + '</span>';
-
-        item.appendChild(checkbox);
+        var name = document.createElement('span');
+        name.className = 'deck-name';
+        name.textContent = searchResults ? deck.fullName : deck.name.split('::').pop();
+        var counts = document.createElement('span');
+        counts.className = 'counts';
+        counts.textContent = (deck.review || 0) + (deck.learn || 0) + (deck.new || 0);
+        label.appendChild(name);
+        label.appendChild(counts);
         item.appendChild(label);
-        li.appendChild(item);
-
-        if (node.children && node.children.length > 0) {
-            li.classList.add('has-children', 'expanded');
-            var toggle = document.createElement('span');
-            toggle.className = 'toggle';
-            toggle.onclick = function (e) {
-                e.stopPropagation();
-                if (li.classList.contains('expanded')) {
-                    li.classList.remove('expanded');
-                } else {
-                    li.classList.add('expanded');
-                }
-            };
-            item.insertBefore(toggle, checkbox);
+        return el;
+    }
 
-            var nested = document.createElement('ul');
-            nested.className = 'nested-list';
-            for (var i = 0; i < node.children.length; i++) {
-                buildNode(node.children[i], nested);
-            }
-            li.appendChild(nested);
+    function setExpanded(id, open) {
+        if (open) {
+            expanded[id] = true;
+            if (!kids[id]) loadChildren(id, 0);
+        } else {
+            delete expanded[id];
         }
+        rebuildRows();
+    }
 
-        parentUl.appendChild(li);
+    if (container) {
+        container.onclick = function (e) {
+            var row = e.target.closest('.deck-row');
+            if (!row) return;
+            var more = row.getAttribute('data-more');
+            if (more !== null) {
+                row.removeAttribute('data-more');
+                loadChildren(Number(more), kids[more].ids.length);
+            } else if (e.target.classList.contains('toggle')) {
+                e.stopPropagation();
+                var id = Number(row.getAttribute('data-deck-id'));
+                setExpanded(id, !expanded[id]);
+            }
+        };
+        container.onchange = function (e) {
+            if (!e.target.classList.contains('deck-checkbox')) return;
+            toggleSelection(Number(e.target.value), e.target.checked);
+        };
     }
+    AnkiTaskbar.listen(document, 'scroll', scheduleRender, true);
+    AnkiTaskbar.listen(window, 'resize', scheduleRender);
 
     // --- Selection Logic ---
-    function updateChildren(li, checked) {
-        var cbs = li.querySelectorAll('input.deck-checkbox');
-        for (var i = 0; i < cbs.length; i++) {
-            cbs[i].checked = checked;
-            cbs[i].indeterminate = false;
-        }
+    function setSelected(id, on) {
+        if (!!selected[id] === on) return;
+        if (on) selected[id] = true;
+        else delete selected[id];
+        selectedCount += on ? 1 : -1;
+        var path = paths[id] || [];
+        for (var i = 0; i < path.length; i++) partial[path[i]] = (partial[path[i]] || 0) + (on ? 1 : -1);
     }
 
-    function updateAncestors(li) {
-        var parentLi = (li.parentElement && li.parentElement.tagName === 'UL') ? li.parentElement.closest('li') : null;
-        while (parentLi) {
-            var cb = parentLi.querySelector('.deck-item > input.deck-checkbox');
-            var nestedList = parentLi.querySelector('.nested-list');
-            if (cb && nestedList) {
-                var children = nestedList.querySelectorAll(':scope > li > .deck-item > input.deck-checkbox');
-                var checkedCount = 0;
-                var indetCount = 0;
-                for (var i = 0; i < children.length; i++) {
-                    if (children[i].checked) checkedCount++;
-                    if (children[i].indeterminate) indetCount++;
-                }
+    function selectSubtree(pairs, on) {
+        for (var i = 0; i < pairs.length; i++) {
+            var child = pairs[i][0], parent = pairs[i][1];
+            paths[child] = parent ? (paths[parent] || []).concat([parent]) : [];
+            setSelected(child, on);
+        }
+    }
 
-                if (checkedCount === children.length) {
-                    cb.checked = true;
-                    cb.indeterminate = false;
-                } else if (checkedCount > 0 || indetCount > 0) {
-                    cb.checked = false;
-                    cb.indeterminate = true;
-                } else {
-                    cb.checked = false;
-                    cb.indeterminate = false;
-                }
+    function toggleSelection(id, on) {
+        AnkiTaskbar.callBackendAsync('get_deck_descendants', [String(id)]).then(function (pairs) {
+            setSelected(id, on);
+            selectSubtree(pairs, on);
+            // A parent is checked exactly when its whole subtree is
+            var path = paths[id] || [];
+            for (var i = path.length - 1; i >= 0; i--) {
+                var ancestor = path[i];
+                if (!on) setSelected(ancestor, false);
+                else if (decks[ancestor] && partial[ancestor] === decks[ancestor].descendants) setSelected(ancestor, true);
+                else break;
             }
-            parentLi = (parentLi.parentElement && parentLi.parentElement.tagName === 'UL') ? parentLi.parentElement.closest('li') : null;
-        }
+            updateSelectionCounter();
+            scheduleRender();
+        });
     }
 
     function updateSelectionCounter() {
-        var checkedLabels = document.querySelectorAll('input.deck-checkbox:checked');
-        var count = checkedLabels.length;
+        var count = selectedCount;
         var counter = document.getElementById('selection-count');
         if (counter) counter.textContent = AnkiTaskbar.t('n_decks_selected').replace('%n', count);
         var counterContainer = document.getElementById('selection-counter');
         if (counterContainer) counterContainer.style.display = count > 0 ? 'block' : 'none';
     }
 
-    function loadSelection() {
-        if (isEditing) {
-            AnkiTaskbar.callBackend('get_sessions').then(function (data) {
-                var allSessions = data.sessions || [];
-                var session = null;
-                for (var i = 0; i < allSessions.length; i++) {
-                    if (String(allSessions[i].id) === editingSessionId) {
-                        session = allSessions[i];
-                        break;
-                    }
-                }
-                if (session) {
-                    if (nameInput) nameInput.value = session.name || '';
-                    var deckIds = session.deck_ids || [];
-                    var idSet = {};
-                    for (var j = 0; j < deckIds.length; j++) idSet[deckIds[j]] = true;
-                    restoreCheckboxes(idSet);
-                    if (createBtn) {
-                        var span = createBtn.querySelector('span');
-                        if (span) span.textContent = AnkiTaskbar.t('save_changes');
-                        else createBtn.textContent = AnkiTaskbar.t('save_changes');
-                    }
-                }
-            });
-        } else {
-            AnkiTaskbar.callBackend('get_selected_decks').then(function (data) {
-                var selected = data.selected_decks || [];
-                var idSet = {};
-                for (var i = 0; i < selected.length; i++) idSet[selected[i]] = true;
-                restoreCheckboxes(idSet);
-            });
-        }
+    function selectedIds() {
+        var ids = [];
+        for (var id in selected) ids.push(Number(id));
+        return ids;
     }
 
-    function restoreCheckboxes(idSet) {
-        var cbs = document.querySelectorAll('input.deck-checkbox');
-        for (var i = 0; i < cbs.length; i++) {
-            var cb = cbs[i];
-            if (idSet[cb.value]) {
-                cb.checked = true;
-                updateAncestors(cb.closest('li'));
+    function applySession(data) {
+        var allSessions = data.sessions || [];
+        var session = null;
+        for (var i = 0; i < allSessions.length; i++) {
+            if (String(allSessions[i].id) === editingSessionId) {
+                session = allSessions[i];
+                break;
             }
         }
-        updateSelectionCounter();
+        if (!session) return updateSelectionCounter();
+        if (nameInput) nameInput.value = session.name || '';
+        restoreSelection(session.deck_ids || []);
+        if (createBtn) {
+            var span = createBtn.querySelector('span');
+            if (span) span.textContent = AnkiTaskbar.t('save_changes');
+            else createBtn.textContent = AnkiTaskbar.t('save_changes');
+        }
+    }
+
+    function restoreSelection(ids) {
+        if (!ids.length) return updateSelectionCounter();
+        AnkiTaskbar.callBackendAsync('get_deck_paths', [JSON.stringify(ids)]).then(function (found) {
+            for (var i = 0; i < ids.length; i++) {
+                // Decks deleted since the selection was saved are left out; top-level decks map to []
+                if (!found.hasOwnProperty(ids[i])) continue;
+                paths[ids[i]] = found[ids[i]];
+                setSelected(ids[i], true);
+            }
+            updateSelectionCounter();
+            scheduleRender();
+        });
     }
 
     // --- Save Actions ---
     if (saveBtn) {
         saveBtn.onclick = function () {
-            var checkedInputs = document.querySelectorAll('input.deck-checkbox:checked');
-            var ids = [];
-            for (var i = 0; i < checkedInputs.length; i++) {
-                ids.push(Number(checkedInputs[i].value));
-            }
+            var ids = selectedIds();
             saveBtn.disabled = true;
             var originalText = saveBtn.innerHTML;
             saveBtn.textContent = AnkiTaskbar.t('saving');
             AnkiTaskbar.callBackend('save_selected_decks', [JSON.stringify(ids)]).then(function (res) {
                 if (res && res.ok) {
                     saveBtn.textContent = AnkiTaskbar.t('saved_status');
-                    setTimeout(function () { window.location.href = 'index.html'; }, 500);
+                    setTimeout(function () { AnkiTaskbar.navigate('index.html'); }, 500);
                 } else {
                     saveBtn.disabled = false;
                     saveBtn.innerHTML = originalText;
@@ -226,13 +337,8 @@ document.addEventListener("DOMContentLoaded", function () {
             var name = nameInput.value.trim();
             if (!name) return setStatus(AnkiTaskbar.t('name_required'), 'error');
 
-            var checkedInputs = document.querySelectorAll('input.deck-checkbox:checked');
-            if (checkedInputs.length === 0) return setStatus(AnkiTaskbar.t('select_decks_error'), 'error');
-
-            var ids = [];
-            for (var i = 0; i < checkedInputs.length; i++) {
-                ids.push(Number(checkedInputs[i].value));
-            }
+            var ids = selectedIds();
+            if (ids.length === 0) return setStatus(AnkiTaskbar.t('select_decks_error'), 'error');
 
             createBtn.disabled = true;
             var payload = isEditing ? { id: editingSessionId, name: name, deck_ids: ids } : { name: name, deck_ids: ids };
@@ -241,7 +347,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 if (res && res.ok) {
                     setStatus(isEditing ? AnkiTaskbar.t('saved_status') : AnkiTaskbar.t('created'), 'ok');
                     sessionStorage.removeItem('editingSessionId');
-                    setTimeout(function () { window.location.href = isEditing ? 'sessions.html' : 'index.html'; }, 1000);
+                    setTimeout(function () { AnkiTaskbar.navigate(isEditing ? 'sessions.html' : 'index.html'); }, 1000);
                 } else {
                     createBtn.disabled = false;
                     setStatus(AnkiTaskbar.t('error_status'), 'error');
@@ -253,57 +359,70 @@ document.addEventListener("DOMContentLoaded", function () {
     // --- Bulk Actions ---
     var btnAll = document.getElementById('btn-all');
     if (btnAll) btnAll.onclick = function () {
-        var cbs = document.querySelectorAll('input.deck-checkbox');
-        for (var i = 0; i < cbs.length; i++) {
-            cbs[i].checked = true;
-            cbs[i].indeterminate = false;
-        }
-        updateSelectionCounter();
+        AnkiTaskbar.callBackendAsync('get_deck_descendants', ['0']).then(function (pairs) {
+            selectSubtree(pairs, true);
+            updateSelectionCounter();
+            scheduleRender();
+        });
     };
 
     var btnNone = document.getElementById('btn-none');
     if (btnNone) btnNone.onclick = function () {
-        var cbs = document.querySelectorAll('input.deck-checkbox');
-        for (var i = 0; i < cbs.length; i++) {
-            cbs[i].checked = false;
-            cbs[i].indeterminate = false;
-        }
+        selected = {};
+        partial = {};
+        selectedCount = 0;
         updateSelectionCounter();
+        scheduleRender();
     };
 
     var btnExpandAll = document.getElementById('btn-expand-all');
     if (btnExpandAll) btnExpandAll.onclick = function () {
-        var listItems = document.querySelectorAll('li.has-children');
-        for (var i = 0; i < listItems.length; i++) {
-            listItems[i].classList.add('expanded');
-        }
+        expandAll(++expandGeneration);
     };
 
+    function expandAll(generation) {
+        // Expands level by level as children arrive; Collapse cancels it
+        if (generation !== expandGeneration) return;
+        var pending = [];
+        for (var id in decks) {
+            if (decks[id].children > 0 && !expanded[id]) {
+                expanded[id] = true;
+                if (!kids[id]) pending.push(loadChildren(Number(id), 0));
+            }
+        }
+        rebuildRows();
+        if (pending.length) Promise.all(pending).then(function () { expandAll(generation); });
+    }
+
     var btnCollapseAll = document.getElementById('btn-collapse-all');
     if (btnCollapseAll) btnCollapseAll.onclick = function () {
-        var listItems = document.querySelectorAll('li.has-children');
-        for (var i = 0; i < listItems.length; i++) {
-            listItems[i].classList.remove('expanded');
-        }
+        expandGeneration++;
+        expanded = {};
+        rebuildRows();
     };
 
     // --- Search ---
     var searchInput = document.getElementById('search-input');
     if (searchInput) {
         searchInput.oninput = function (e) {
-            var term = e.target.value.toLowerCase();
-            var listItems = document.querySelectorAll('#deck-tree-container li');
-            for (var i = 0; i < listItems.length; i++) {
-                var li = listItems[i];
-                var nameEl = li.querySelector('.deck-name');
-                var name = nameEl ? nameEl.textContent.toLowerCase() : '';
-                var visible = !term || name.indexOf(term) !== -1;
-                li.style.display = visible ? '' : 'none';
-                if (visible && term) {
-                    var parent = li.closest('.has-children');
-                    if (parent) parent.classList.add('expanded');
-                }
+            var term = e.target.value.trim();
+            var seq = ++searchSeq;
+            if (!term) {
+                searchResults = null;
+                rebuildRows();
+                return;
             }
+            AnkiTaskbar.callBackendAsync('search_decks', [term, PAGE_SIZE]).then(function (matches) {
+                if (seq !== searchSeq) return;
+                var ids = [];
+                for (var i = 0; i < matches.length; i++) {
+                    decks[matches[i].id] = matches[i];
+                    paths[matches[i].id] = matches[i].path || [];
+                    ids.push(matches[i].id);
+                }
+                searchResults = ids;
+                rebuildRows();
+            });
         };
     }
-});
\ No newline at end of file
+});
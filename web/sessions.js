@@ -1,4 +1,4 @@
-document.addEventListener("DOMContentLoaded", function () {
+AnkiTaskbar.registerView('sessions', function () {
     // Initialize common utilities and bridge
     AnkiTaskbar.init(function (py) {
         if (!py) return;
@@ -11,21 +11,74 @@ document.addEventListener("DOMContentLoaded", function () {
 
     // --- State Management ---
     window.sessionData = { folders: [], sessions: [], active_session_id: null };
+    window.sessionsVersion = '';
     window.currentFolderId = null;
+    window.renderedFolderId = undefined;
     window.focusSection = 'folders'; // 'folders' or 'sessions'
     window.folderFocusIndex = 0;
     window.sessionFocusIndex = 0;
 
     // --- Data Refresh & Rendering ---
+    // Asks only for sessions changed since the version we hold and patches their cards
     window.refreshData = function () {
-        AnkiTaskbar.callBackend('get_sessions', []).then(function (data) {
-            window.sessionData = data || { sessions: [], folders: [], active_session_id: null };
-            renderFolders();
-            renderMainContent();
-            updateKeyboardNavState();
-        });
+        AnkiTaskbar.callBackendAsync('get_sessions_delta', [window.sessionsVersion]).then(applySessionsDelta);
     };
 
+    function applySessionsDelta(delta) {
+        if (!delta) return;
+        var data = window.sessionData;
+        var foldersChanged = JSON.stringify(delta.folders || []) !== JSON.stringify(data.folders || []);
+        var activeChanged = String(delta.active_session_id || '') !== String(data.active_session_id || '');
+        var rerender = window.renderedFolderId !== window.currentFolderId || foldersChanged;
+        var changed = [];
+        data.folders = delta.folders || [];
+        data.active_session_id = delta.active_session_id;
+        window.sessionsVersion = delta.version;
+
+        if (delta.full) {
+            data.sessions = delta.items || [];
+            rerender = true;
+        } else if (!delta.unchanged) {
+            var byId = {};
+            for (var i = 0; i < data.sessions.length; i++) byId[String(data.sessions[i].id)] = data.sessions[i];
+            for (var i = 0; i < delta.changed.length; i++) {
+                var s = delta.changed[i];
+                var old = byId[String(s.id)];
+                // A card entering or leaving the current folder changes the grid
+                if (!old || (window.currentFolderId && old.folder !== s.folder)) rerender = true;
+                byId[String(s.id)] = s;
+                changed.push(s);
+            }
+            var sessions = [];
+            if (delta.order) {
+                // Keep a shuffled order for sessions that stayed
+                var seen = {};
+                var current = {};
+                for (var i = 0; i < delta.order.length; i++) current[delta.order[i]] = true;
+                for (var i = 0; i < data.sessions.length; i++) {
+                    var id = String(data.sessions[i].id);
+                    if (current[id]) { sessions.push(byId[id]); seen[id] = true; }
+                }
+                for (var i = 0; i < delta.order.length; i++) {
+                    if (!seen[delta.order[i]]) sessions.push(byId[delta.order[i]]);
+                }
+                rerender = true;
+            } else {
+                for (var i = 0; i < data.sessions.length; i++) sessions.push(byId[String(data.sessions[i].id)]);
+            }
+            data.sessions = sessions;
+        }
+
+        if (foldersChanged || window.renderedFolderId !== window.currentFolderId) renderFolders();
+        if (rerender) {
+            renderMainContent();
+        } else if (changed.length || activeChanged) {
+            patchSessionCards(changed);
+        } else {
+            return;
+        }
+        updateKeyboardNavState();
+    }
     function renderFolders() {
         var list = document.getElementById('folders-list');
         if (!list) return;
@@ -101,60 +154,77 @@ document.addEventListener("DOMContentLoaded", function () {
             fragment.appendChild(empty);
         } else {
             for (var i = 0; i < sessions.length; i++) {
-                (function () {
-                    var s = sessions[i];
-                    var card = document.createElement('div');
-                    var isThisActive = (String(s.id) === activeId);
-
-                    card.className = 'session-card' + (isThisActive ? ' active-session' : '');
-                    var progress = (s.progress || 0) * 100;
-                    var deckCount = (s.deck_ids && s.deck_ids.length) || 0;
-
-                    var html =
-                        '<div class="card-header">' +
-                        '<span class="card-title">' + s.name + '</span>' +
-                        '<span class="card-menu-btn">\u22EE</span>' +
-                        '</div>';
-
-                    if (s.folder) {
-                        html += '<div class="folder-badge">' + s.folder + '</div>';
-                    }
-
-                    html += '<div class="session-progress-wrapper">' +
-                        '<div class="session-progress-text">' + Math.round(progress) + '%</div>' +
-                        '<div class="session-progress-container">' +
-                        '<div class="session-progress-bar" style="width: ' + progress + '%"></div>' +
-                        '</div>' +
-                        '</div>' +
-                        '<div class="card-meta">' + deckCount + ' ' + AnkiTaskbar.t('decks') + '</div>';
-
-                    card.innerHTML = html;
-
-                    card.onclick = function () {
-                        if (window.py) {
-                            window.py.activate_session(String(s.id));
-                            setTimeout(function () { window.location.href = 'index.html'; }, 150);
-                        }
-                    };
-
-                    var dots = card.querySelector('.card-menu-btn');
-                    dots.onclick = function (e) {
-                        e.stopPropagation();
-                        showContextMenu(e, [
-                            { label: AnkiTaskbar.t('edit'), action: function () { editSession(s.id); } },
-                            { label: AnkiTaskbar.t('move_to_folder'), action: function () { moveSession(s.id); } },
-                            { label: AnkiTaskbar.t('duplicate'), action: function () { duplicateSession(s.id); } },
-                            { label: AnkiTaskbar.t('delete'), action: function () { deleteSession(s.id); }, danger: true }
-                        ]);
-                    };
-
-                    fragment.appendChild(card);
-                })();
+                fragment.appendChild(buildSessionCard(sessions[i], activeId));
             }
         }
 
         container.innerHTML = '';
         container.appendChild(fragment);
+        window.renderedFolderId = window.currentFolderId;
+    }
+
+    function buildSessionCard(s, activeId) {
+        var card = document.createElement('div');
+        var isThisActive = (String(s.id) === activeId);
+
+        card.className = 'session-card' + (isThisActive ? ' active-session' : '');
+        card.setAttribute('data-session-id', String(s.id));
+        var progress = (s.progress || 0) * 100;
+        var deckCount = (s.deck_ids && s.deck_ids.length) || 0;
+
+        var html =
+            '<div class="card-header">' +
+            '<span class="card-title">' + s.name + '</span>' +
+            '<span class="card-menu-btn">\u22EE</span>' +
+            '</div>';
+
+        if (s.folder) {
+            html += '<div class="folder-badge">' + s.folder + '</div>';
+        }
+
+        html += '<div class="session-progress-wrapper">' +
+            '<div class="session-progress-text">' + Math.round(progress) + '%</div>' +
+            '<div class="session-progress-container">' +
+            '<div class="session-progress-bar" style="width: ' + progress + '%"></div>' +
+            '</div>' +
+            '</div>' +
+            '<div class="card-meta">' + deckCount + ' ' + AnkiTaskbar.t('decks') +
+            (s.due_tomorrow ? ' \u00b7 ' + AnkiTaskbar.t('due_tomorrow') + ': ' + s.due_tomorrow : '') + '</div>';
+
+        card.innerHTML = html;
+
+        card.onclick = function () {
+            if (window.py) {
+                window.py.activate_session(String(s.id));
+                setTimeout(function () { AnkiTaskbar.navigate('index.html'); }, 150);
+            }
+        };
+
+        var dots = card.querySelector('.card-menu-btn');
+        dots.onclick = function (e) {
+            e.stopPropagation();
+            showContextMenu(e, [
+                { label: AnkiTaskbar.t('edit'), action: function () { editSession(s.id); } },
+                { label: AnkiTaskbar.t('move_to_folder'), action: function () { moveSession(s.id); } },
+                { label: AnkiTaskbar.t('duplicate'), action: function () { duplicateSession(s.id); } },
+                { label: AnkiTaskbar.t('delete'), action: function () { deleteSession(s.id); }, danger: true }
+            ]);
+        };
+        return card;
+    }
+
+    // Swaps in fresh cards for `changed` sessions and moves the active marker
+    function patchSessionCards(changed) {
+        var activeId = String(window.sessionData.active_session_id || '');
+        for (var i = 0; i < changed.length; i++) {
+            var old = document.querySelector('.session-card[data-session-id="' + changed[i].id + '"]');
+            if (old) old.parentNode.replaceChild(buildSessionCard(changed[i], activeId), old);
+        }
+        var cards = document.querySelectorAll('.session-card');
+        for (var i = 0; i < cards.length; i++) {
+            if (cards[i].getAttribute('data-session-id') === activeId) cards[i].classList.add('active-session');
+            else cards[i].classList.remove('active-session');
+        }
     }
 
     // --- Keyboard Navigation ---
@@ -285,7 +355,7 @@ document.addEventListener("DOMContentLoaded", function () {
         ];
     }
 
-    document.addEventListener('keydown', handleKeyDown);
+    AnkiTaskbar.listen(document, 'keydown', handleKeyDown);
 
     // --- Actions ---
     function renameFolder(currentName) {
@@ -303,7 +373,7 @@ document.addEventListener("DOMContentLoaded", function () {
 
     function editSession(id) {
         sessionStorage.setItem('editingSessionId', id);
-        window.location.href = 'select-deck.html';
+        AnkiTaskbar.navigate('select-deck.html');
     }
 
     function deleteSession(id) {
@@ -385,7 +455,7 @@ document.addEventListener("DOMContentLoaded", function () {
     if (newSessionBtn) {
         newSessionBtn.onclick = function () {
             sessionStorage.removeItem('editingSessionId');
-            window.location.href = 'select-deck.html';
+            AnkiTaskbar.navigate('select-deck.html');
         };
     }
 
@@ -1,8 +1,11 @@
-document.addEventListener("DOMContentLoaded", function () {
+AnkiTaskbar.registerView('setting', function () {
     // Initialize common utilities and bridge
     AnkiTaskbar.init(function (py) {
         if (!py) return;
-        AnkiTaskbar.loadAndApplySettings(applySettingsToUI);
+        AnkiTaskbar.loadAndApplySettings(function (cfg) {
+            applySettingsToUI(cfg);
+            refreshPerfStats();
+        });
     });
 
     var statusEl = document.getElementById("settings-status");
@@ -23,7 +26,8 @@ document.addEventListener("DOMContentLoaded", function () {
     var toggles = [
         "hideDecksToggle", "sessionToggle", "sessionsEnabledToggle", "showStatsBarToggle",
         "alwaysOnTopToggle", "hideSearchBarToggle", "compactModeToggle",
-        "confettiToggle", "hideCompletedSessionsToggle", "randomSessionsToggle", "movableToggle"
+        "confettiToggle", "hideCompletedSessionsToggle", "randomSessionsToggle", "movableToggle",
+        "preloadOnStartupToggle", "perfStatsToggle"
     ];
 
     function getSettingsFromUI() {
@@ -233,7 +237,7 @@ document.addEventListener("DOMContentLoaded", function () {
 
     var tourBtn = document.getElementById("start-tour");
     if (tourBtn) {
-        tourBtn.addEventListener('click', function () { window.location.href = 'index.html?startTour=true'; });
+        tourBtn.addEventListener('click', function () { AnkiTaskbar.navigate('index.html?startTour=true'); });
     }
 
     var exportSessionsBtn = document.getElementById("export-sessions");
@@ -267,4 +271,83 @@ document.addEventListener("DOMContentLoaded", function () {
             });
         });
     }
+
+    // --- Diagnostics ---
+    var perfEl = document.getElementById("perf-stats");
+
+    function renderPerfStats(stats) {
+        if (!perfEl) return;
+        perfEl.innerHTML = '';
+        var renderer = stats && stats.renderer;
+        if (renderer && (renderer.renderer_kb || renderer.saved_kb)) {
+            var mem = document.createElement('div');
+            mem.className = 'setting-desc';
+            mem.style.marginBottom = '8px';
+            var text = AnkiTaskbar.t('perf_renderer') + ': ' + (renderer.renderer_kb ? (renderer.renderer_kb / 1024).toFixed(1) + ' MiB' : '-');
+            if (renderer.saved_kb) text += ' \u00b7 ' + (renderer.saved_kb / 1024).toFixed(1) + ' MiB ' + AnkiTaskbar.t('perf_renderer_saved');
+            mem.textContent = text;
+            perfEl.appendChild(mem);
+        }
+        var slots = (stats && stats.slots) || [];
+        if (!slots.length) {
+            perfEl.appendChild(document.createTextNode(AnkiTaskbar.t('perf_empty')));
+            return;
+        }
+        var table = document.createElement('table');
+        var columns = [
+            ['perf_slot', 'name'], ['perf_calls', 'calls'], ['perf_avg', 'avg_ms'], ['perf_p95', 'p95_ms'],
+            ['perf_max', 'max_ms'], ['perf_size', 'avg_bytes'], ['perf_errors', 'errors']
+        ];
+        var head = table.insertRow();
+        for (var c = 0; c < columns.length; c++) {
+            var th = document.createElement('th');
+            th.textContent = AnkiTaskbar.t(columns[c][0]);
+            head.appendChild(th);
+        }
+        for (var i = 0; i < slots.length; i++) {
+            var row = table.insertRow();
+            for (var c = 0; c < columns.length; c++) {
+                var value = slots[i][columns[c][1]];
+                if (columns[c][1] === 'avg_bytes') value = (value / 1024).toFixed(1);
+                else if (columns[c][1] === 'p95_ms' && value === null) value = '>' + stats.buckets_ms[stats.buckets_ms.length - 1];
+                else if (typeof value === 'number' && value % 1) value = value.toFixed(2);
+                row.insertCell().textContent = value;
+            }
+        }
+        perfEl.appendChild(table);
+
+        var errors = stats.errors || [];
+        if (!errors.length) return;
+        var title = document.createElement('div');
+        title.className = 'setting-label';
+        title.style.marginTop = '12px';
+        title.textContent = AnkiTaskbar.t('perf_recent_errors');
+        perfEl.appendChild(title);
+        for (var e = errors.length - 1; e >= 0 && e >= errors.length - 10; e--) {
+            var pre = document.createElement('pre');
+            pre.textContent = errors[e].slot + ' @ ' + new Date(errors[e].time * 1000).toLocaleTimeString() + '\n' + errors[e].error;
+            perfEl.appendChild(pre);
+        }
+    }
+
+    function refreshPerfStats() {
+        AnkiTaskbar.callBackend('get_perf_stats').then(renderPerfStats);
+    }
+
+    var perfRefreshBtn = document.getElementById("perf-refresh");
+    if (perfRefreshBtn) perfRefreshBtn.addEventListener('click', refreshPerfStats);
+
+    var perfResetBtn = document.getElementById("perf-reset");
+    if (perfResetBtn) {
+        perfResetBtn.addEventListener('click', function () {
+            AnkiTaskbar.callBackend('reset_perf_stats').then(refreshPerfStats);
+        });
+    }
+
+    var perfExportBtn = document.getElementById("perf-export");
+    if (perfExportBtn) {
+        perfExportBtn.addEventListener('click', function () {
+            AnkiTaskbar.callBackend('export_perf_stats').then(function (res) { if (res && res.ok) setStatus(AnkiTaskbar.t('saved_status'), 'ok'); });
+        });
+    }
 });
@@ -143,7 +143,8 @@ class Tour {
             // Check if this step has a navigation instruction
             if (step.navigateTo) {
                 // Navigate to the next page with tour parameter
-                window.location.href = step.navigateTo;
+                if (window.AnkiTaskbar) AnkiTaskbar.navigate(step.navigateTo);
+                else window.location.href = step.navigateTo;
                 return;
             }
 
@@ -175,9 +176,13 @@ class Tour {
     }
 }
 
-// Initialize on index.html
-if (window.location.pathname.endsWith('index.html') || window.location.pathname === '/' || window.location.pathname.endsWith('/')) {
-    document.addEventListener('DOMContentLoaded', () => {
+// Start the tour for the current page if requested via ?startTour=true.
+// Runs on page load and again after each single-page view switch.
+window.startTourIfRequested = function () {
+    const path = window.location.pathname;
+
+    // Initialize on index.html
+    if (path.endsWith('index.html') || path === '/' || path.endsWith('/')) {
         const urlParams = new URLSearchParams(window.location.search);
         if (urlParams.get('startTour') === 'true') {
             const indexSteps = [
@@ -243,12 +248,10 @@ if (window.location.pathname.endsWith('index.html') || window.location.pathname
             window.currentTour = tour;
             tour.start();
         }
-    });
-}
+    }
 
-// Initialize on sessions.html
-if (window.location.pathname.endsWith('sessions.html')) {
-    document.addEventListener('DOMContentLoaded', () => {
+    // Initialize on sessions.html
+    if (path.endsWith('sessions.html')) {
         const urlParams = new URLSearchParams(window.location.search);
         if (urlParams.get('startTour') === 'true') {
             const sessionSteps = [
@@ -318,5 +321,7 @@ if (window.location.pathname.endsWith('sessions.html')) {
             window.currentTour = tour;
             tour.start();
         }
-    });
-}
+    }
+};
+
+document.addEventListener('DOMContentLoaded', window.startTourIfRequested);